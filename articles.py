@@ -0,0 +1,154 @@
+# articles.py
+"""
+On-disk article cache shared by digest.py and speak.py.
+
+One JSON file per canonical article URL (data/cache/articles/ab/<sha1>.json) with the
+response validators (ETag / Last-Modified), the trafilatura full text and the short
+summary derived from it. Entries are fresh for TTL_S (failures for FAIL_TTL_S); stale
+ones are revalidated with a conditional GET. Reads bump the file mtime and evict() drops
+least-recently-used files beyond MAX_BYTES. Writes are atomic renames of per-writer temp
+files, so concurrent processes only ever see whole entries (last writer wins).
+"""
+from __future__ import annotations
+from pathlib import Path
+from concurrent.futures import Executor, ThreadPoolExecutor
+import asyncio, json, os, re, time, uuid
+from canon import canonical_url, url_hash
+
+# Optional (article download + extraction)
+try:
+    import httpx, trafilatura  # pip install httpx trafilatura
+except Exception:
+    httpx = None
+    trafilatura = None
+
+CACHE_DIR = Path("data/cache/articles")
+TTL_S = 7 * 86400          # extracted text is reused this long without asking the server
+FAIL_TTL_S = 3600          # failed downloads aren't retried before this
+MAX_BYTES = 200 * 1024**2  # LRU budget for the whole cache
+FETCH_CONN = 8             # concurrent downloads (one pooled client)
+FETCH_TIMEOUT_S = 10.0     # per article: download + extraction
+WORKERS = 4                # trafilatura runs here, off the event loop
+USER_AGENT = "KernelcutBot/1.0"
+
+def first_sentences(text: str, max_chars: int = 240, max_sents: int = 2) -> str:
+    if not text:
+        return ""
+    parts = re.split(r"(?<=[\.\!\?])\s+", text)
+    out = []
+    for p in parts:
+        p = p.strip()
+        if not p:
+            continue
+        out.append(p)
+        if len(" ".join(out)) >= max_chars or len(out) >= max_sents:
+            break
+    s = " ".join(out).strip()
+    return s if len(s) <= max_chars else s[: max_chars - 1].rstrip() + "…"
+
+def extract(html: str) -> str:
+    txt = trafilatura.extract(html, include_comments=False, include_tables=False)
+    return re.sub(r"\s+", " ", txt).strip() if txt else ""
+
+# --- cache files ---
+
+def entry_path(url: str) -> Path:
+    h = url_hash(canonical_url(url))
+    return CACHE_DIR / h[:2] / f"{h}.json"
+
+def load(url: str) -> dict | None:
+    p = entry_path(url)
+    try:
+        entry = json.loads(p.read_text(encoding="utf-8"))
+        os.utime(p)  # LRU: mtime = last use
+        return entry
+    except (OSError, ValueError):  # missing, evicted meanwhile, or unreadable
+        return None
+
+def save(url: str, entry: dict):
+    p = entry_path(url)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_name(f"{p.stem}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp")
+    tmp.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(p)
+
+def is_fresh(entry: dict | None, now: float | None = None) -> bool:
+    return bool(entry) and (now or time.time()) < entry.get("expires", 0)
+
+def evict(max_bytes: int = MAX_BYTES) -> int:
+    """Drop least-recently-used entries until the cache fits in max_bytes."""
+    files = []
+    for p in CACHE_DIR.glob("*/*.json"):
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        files.append((st.st_mtime, st.st_size, p))
+    total, n = sum(size for _, size, _ in files), 0
+    for _, size, p in sorted(files):
+        if total <= max_bytes:
+            break
+        p.unlink(missing_ok=True)
+        total -= size
+        n += 1
+    return n
+
+# --- fetching ---
+
+async def fetch_many(urls: list[str], pool: Executor | None = None) -> dict[str, dict]:
+    """
+    url -> cache entry for every distinct url: fresh entries come from disk, the rest are
+    (re)fetched concurrently and extracted in `pool`. Failures and timeouts are cached
+    as {"ok": False} (or keep the older text) for FAIL_TTL_S.
+    """
+    urls = list(dict.fromkeys(u for u in urls if isinstance(u, str) and u))
+    cached = {u: load(u) for u in urls}
+    todo = [u for u in urls if not is_fresh(cached[u])]
+    if not todo or not (httpx and trafilatura):
+        return {u: e for u, e in cached.items() if e}
+
+    loop = asyncio.get_running_loop()
+    sem = asyncio.Semaphore(FETCH_CONN)
+    limits = httpx.Limits(max_connections=FETCH_CONN)
+    async with httpx.AsyncClient(timeout=FETCH_TIMEOUT_S, follow_redirects=True, limits=limits,
+                                 headers={"User-Agent": USER_AGENT}) as c:
+        async def refresh(url: str, prev: dict | None) -> dict:
+            headers = {}
+            if prev and prev.get("ok"):
+                if prev.get("etag"):
+                    headers["If-None-Match"] = prev["etag"]
+                if prev.get("last_modified"):
+                    headers["If-Modified-Since"] = prev["last_modified"]
+            r = await c.get(url, headers=headers)
+            if r.status_code == 304 and headers:
+                return {**prev, "expires": time.time() + TTL_S}
+            r.raise_for_status()
+            text = await loop.run_in_executor(pool, extract, r.text)
+            return {
+                "url": url, "ok": True, "fetched": time.time(), "expires": time.time() + TTL_S, "status": r.status_code,
+                "etag": r.headers.get("etag"), "last_modified": r.headers.get("last-modified"),
+                "text": text, "summary": first_sentences(text, max_chars=260, max_sents=2),
+            }
+
+        async def one(url: str) -> dict:
+            async with sem:  # the deadline starts when the request does, not while queued
+                try:
+                    entry = await asyncio.wait_for(refresh(url, cached[url]), FETCH_TIMEOUT_S)
+                except Exception as e:
+                    # keep older text if we had some; either way don't retry before FAIL_TTL_S
+                    prev = cached[url] if cached[url] and cached[url].get("ok") else {"url": url, "ok": False}
+                    entry = {**prev, "expires": time.time() + FAIL_TTL_S, "error": type(e).__name__}
+            save(url, entry)
+            return entry
+
+        results = await asyncio.gather(*(one(u) for u in todo))
+    cached.update(zip(todo, results))
+    evict()
+    return {u: e for u, e in cached.items() if e}
+
+def get_many(urls: list[str]) -> dict[str, dict]:
+    pool = ThreadPoolExecutor(WORKERS)
+    try:
+        return asyncio.run(fetch_many(urls, pool))
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)  # don't wait on extractions that timed out
@@ -0,0 +1,183 @@
+# benchmarks/bench_ingest.py
+"""
+Load benchmark for ingest.run against a local synthetic feed server.
+
+    python benchmarks/bench_ingest.py --feeds 2000 --entries 50 --latency-ms 80 \
+        --error-rate 0.02 --redirect-rate 0.1 --max-conn 40 --parse thread
+
+The server runs in a separate process (so RSS/CPU numbers are ingest's own) and
+answers on 127.0.0.1..127.0.0.<hosts> to exercise the per-host limits. Results
+(throughput, per-feed latency percentiles, peak RSS, CPU time, config) are appended
+as one JSON line to --out.
+"""
+from __future__ import annotations
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from datetime import datetime, timezone
+import argparse, asyncio, json, multiprocessing as mp, random, resource, socket, statistics, sys, tempfile, time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import ingest
+
+def make_feed(i: int, entries: int, summary_chars: int, atom: bool) -> bytes:
+    body = ("Synthetic summary text for load testing. " * (summary_chars // 40 + 1))[:summary_chars]
+    if atom:
+        items = "".join(
+            f"<entry><title>Feed {i} story {j}</title><id>urn:kc:{i}:{j}</id>"
+            f'<link href="https://site{i % 97}.example/{i}/{j}?utm_source=bench"/>'
+            f"<updated>2025-01-06T{j % 24:02d}:00:00Z</updated><summary>{body}</summary></entry>"
+            for j in range(entries)
+        )
+        return (f'<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom">'
+                f"<title>Atom {i}</title>{items}</feed>").encode()
+    items = "".join(
+        f"<item><title>Feed {i} story {j}</title><guid>kc-{i}-{j}</guid>"
+        f"<link>https://site{i % 97}.example/{i}/{j}?utm_source=bench</link>"
+        f"<pubDate>Mon, 06 Jan 2025 {j % 24:02d}:00:00 GMT</pubDate><description>{body}</description></item>"
+        for j in range(entries)
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>RSS {i}</title>{items}</channel></rss>'.encode()
+
+def serve(port: int, args: dict, ready):
+    rnd = random.Random(args["seed"])
+    cache: dict[int, bytes] = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *a):
+            pass
+
+        def reply(self, code: int, body: bytes = b"", headers: dict | None = None):
+            self.send_response(code)
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            time.sleep(rnd.expovariate(1.0 / args["latency_s"]) if args["latency_s"] else 0)
+            path = self.path.split("?")[0]
+            if path.startswith("/r/"):
+                return self.reply(301, headers={"Location": "/f/" + path[3:]})
+            if not path.startswith("/f/"):
+                return self.reply(404)
+            if rnd.random() < args["error_rate"]:
+                return self.reply(rnd.choice((500, 503)))
+            i = int(path[3:].split(".")[0])
+            if i not in cache:
+                cache[i] = make_feed(i, args["entries"], args["summary_chars"], atom=i % 3 == 0)
+            self.reply(200, cache[i], {"Content-Type": "application/xml"})
+
+    ThreadingHTTPServer.daemon_threads = True
+    ThreadingHTTPServer.request_queue_size = 1024
+    srv = ThreadingHTTPServer(("", port), Handler)
+    ready.set()
+    srv.serve_forever()
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("", 0))
+        return s.getsockname()[1]
+
+def feed_urls(n: int, hosts: int, port: int, redirect_rate: float, seed: int) -> list[str]:
+    rnd = random.Random(seed + 1)
+    return [
+        f"http://127.0.0.{i % hosts + 1}:{port}/{'r' if rnd.random() < redirect_rate else 'f'}/{i}.xml"
+        for i in range(n)
+    ]
+
+def pct(xs: list[float], p: float) -> float:
+    if not xs:
+        return 0.0
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(round(p / 100 * (len(xs) - 1))))]
+
+def run_bench(urls: list[str], parse_mode: str) -> dict:
+    lat, fails = [], 0
+    fetch_feed = ingest.fetch_feed
+
+    async def timed(client, url, gates=None, pool=None, pending=None, metrics=None):
+        nonlocal fails
+        t0 = time.perf_counter()
+        items = await fetch_feed(client, url, gates, pool, pending, metrics)
+        lat.append(time.perf_counter() - t0)
+        fails += not items
+        return items
+
+    ingest.fetch_feed = timed
+    r0 = resource.getrusage(resource.RUSAGE_SELF)
+    t0 = time.perf_counter()
+    try:
+        rows = asyncio.run(ingest.run(urls, parse_mode=parse_mode))
+    finally:
+        ingest.fetch_feed = fetch_feed
+    wall = time.perf_counter() - t0
+    r1 = resource.getrusage(resource.RUSAGE_SELF)
+    kids = resource.getrusage(resource.RUSAGE_CHILDREN)  # process-pool parse workers (after they exit)
+    return {
+        "wall_s": round(wall, 3),
+        "feeds_per_s": round(len(urls) / wall, 1),
+        "items": len(rows),
+        "items_per_s": round(len(rows) / wall, 1),
+        "empty_or_failed_feeds": fails,
+        "latency_s": {
+            "p50": round(pct(lat, 50), 4), "p95": round(pct(lat, 95), 4), "p99": round(pct(lat, 99), 4),
+            "mean": round(statistics.fmean(lat), 4) if lat else 0.0, "max": round(max(lat, default=0), 4),
+        },
+        "cpu_s": round((r1.ru_utime - r0.ru_utime) + (r1.ru_stime - r0.ru_stime), 3),
+        "cpu_children_s": round(kids.ru_utime + kids.ru_stime, 3),
+        "peak_rss_mb": round(r1.ru_maxrss / 1024, 1),  # KiB on Linux
+    }
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--feeds", type=int, default=500, help="number of feeds (up to ~10k)")
+    ap.add_argument("--entries", type=int, default=40, help="entries per feed")
+    ap.add_argument("--summary-chars", type=int, default=400)
+    ap.add_argument("--latency-ms", type=float, default=50.0, help="mean server latency (exponential)")
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--redirect-rate", type=float, default=0.0)
+    ap.add_argument("--hosts", type=int, default=8, help="spread feeds over 127.0.0.1..N")
+    ap.add_argument("--max-conn", type=int, default=ingest.MAX_CONN)
+    ap.add_argument("--retries", type=int, default=ingest.RETRIES)
+    ap.add_argument("--host-conn", type=int, default=ingest.HOST_CONN)
+    ap.add_argument("--host-rate", type=float, default=ingest.HOST_RATE)
+    ap.add_argument("--parse", default=ingest.PARSE_MODE, choices=["inline", "thread", "process"])
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--out", default="bench_results/ingest.ndjson")
+    args = ap.parse_args()
+
+    port = free_port()
+    ready = mp.Event()
+    cfg = {"seed": args.seed, "latency_s": args.latency_ms / 1000, "error_rate": args.error_rate,
+           "entries": args.entries, "summary_chars": args.summary_chars}
+    server = mp.Process(target=serve, args=(port, cfg, ready), daemon=True)
+    server.start()
+    ready.wait(10)
+
+    ingest.MAX_CONN, ingest.RETRIES = args.max_conn, args.retries
+    ingest.HOST_CONN, ingest.HOST_RATE = args.host_conn, args.host_rate
+    try:
+        with tempfile.TemporaryDirectory() as d:
+            ingest.CACHE_DIR = Path(d)  # cold cache: every feed is downloaded and parsed
+            urls = feed_urls(args.feeds, args.hosts, port, args.redirect_rate, args.seed)
+            result = run_bench(urls, args.parse)
+    finally:
+        server.terminate()
+
+    record = {
+        "ts": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": {k: v for k, v in vars(args).items() if k != "out"} | {"host_burst": ingest.HOST_BURST},
+        "result": result,
+    }
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with out.open("a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+    print(json.dumps(record, indent=2))
+    print(f"appended -> {out}")
+
+if __name__ == "__main__":
+    main()
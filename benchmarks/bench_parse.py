@@ -0,0 +1,66 @@
+# benchmarks/bench_parse.py
+"""
+Inline vs pooled feed parsing: wall-clock for ingest.run over local fixtures.
+
+    python benchmarks/bench_parse.py --feeds 300 --entries 60 --latency-ms 40
+
+Fixtures are generated RSS files served through httpx.MockTransport (no network);
+each mode gets a fresh validator cache so every feed is really parsed.
+"""
+from __future__ import annotations
+from pathlib import Path
+import argparse, asyncio, sys, tempfile, time
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import ingest
+
+def make_fixture(i: int, entries: int) -> bytes:
+    items = "".join(
+        f"<item><title>Story {i}-{j} about compilers and GPUs</title>"
+        f"<link>https://host{i % 25}.example/p/{i}/{j}?utm_source=rss&amp;id={j}</link>"
+        f"<description>{'Lorem ipsum dolor sit amet. ' * 20}</description>"
+        f"<pubDate>Mon, 06 Jan 2025 {j % 24:02d}:00:00 GMT</pubDate></item>"
+        for j in range(entries)
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>Feed {i}</title>{items}</channel></rss>'.encode()
+
+def write_fixtures(root: Path, feeds: int, entries: int) -> list[str]:
+    root.mkdir(parents=True, exist_ok=True)
+    for i in range(feeds):
+        (root / f"feed_{i:04d}.xml").write_bytes(make_fixture(i, entries))
+    return [f"https://host{i % 25}.example/feed_{i:04d}.xml" for i in range(feeds)]
+
+def bench(mode: str, urls: list[str], fixtures: Path, latency_s: float, tmp: Path) -> tuple[float, int]:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency_s)
+        return httpx.Response(200, content=(fixtures / request.url.path.lstrip("/")).read_bytes())
+
+    ingest.CACHE_DIR = tmp / f"cache-{mode}"
+    ingest.make_client = lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    t0 = time.perf_counter()
+    rows = asyncio.run(ingest.run(urls, parse_mode=mode))
+    return time.perf_counter() - t0, len(rows)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--feeds", type=int, default=300)
+    ap.add_argument("--entries", type=int, default=60)
+    ap.add_argument("--latency-ms", type=float, default=40.0)
+    ap.add_argument("--modes", default="inline,thread,process")
+    args = ap.parse_args()
+
+    # keep politeness limits out of the measurement
+    ingest.HOST_CONN, ingest.HOST_RATE, ingest.HOST_BURST = 10_000, 1e9, 1e9
+    with tempfile.TemporaryDirectory() as d:
+        tmp = Path(d)
+        urls = write_fixtures(tmp / "fixtures", args.feeds, args.entries)
+        print(f"{args.feeds} feeds x {args.entries} entries, {args.latency_ms:.0f} ms latency")
+        base = None
+        for mode in args.modes.split(","):
+            secs, n = bench(mode, urls, tmp / "fixtures", args.latency_ms / 1000, tmp)
+            base = base or secs
+            print(f"{mode:>8}: {secs:7.2f}s  {n} items  x{base / secs:.2f} vs {args.modes.split(',')[0]}")
+
+if __name__ == "__main__":
+    main()
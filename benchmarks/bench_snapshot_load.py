@@ -0,0 +1,67 @@
+# benchmarks/bench_snapshot_load.py
+"""
+JSON vs Arrow IPC raw snapshots: transform.load_df time and memory.
+
+    python benchmarks/bench_snapshot_load.py --items 200000
+
+Each format is loaded in a fresh subprocess so peak RSS is per format.
+"""
+from __future__ import annotations
+from pathlib import Path
+import argparse, json, random, subprocess, sys, tempfile
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+PROBE = """
+import sys, time, resource
+sys.path.insert(0, {root!r})
+from pathlib import Path
+import pandas as pd
+import transform
+p = Path({path!r})
+rss = lambda: resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+base = rss()
+t0 = time.perf_counter()
+raw = transform.read_arrow(p) if p.suffix == ".arrow" else pd.DataFrame(transform.read_raw(p))
+t1 = time.perf_counter()
+read_rss = rss() - base
+df = transform.load_df(p)
+t2 = time.perf_counter()
+print(f"{{t1 - t0:.3f}} {{t2 - t1:.3f}} {{read_rss:.1f}} {{rss() - base:.1f}} {{raw.memory_usage(deep=True).sum() / 2**20:.1f}}")
+"""
+
+def make_rows(n: int) -> list[dict]:
+    rnd = random.Random(3)
+    words = [f"word{i}" for i in range(3000)]
+    return [{
+        "source": f"Feed {i % 60}",
+        "title": " ".join(rnd.choices(words, k=9)),
+        "link": f"https://site{i % 300}.example/post/{i}?utm_source=rss&id={i}",
+        "summary": " ".join(rnd.choices(words, k=60)),
+        "published": f"2025-01-{1 + i % 28:02d}T{i % 24:02d}:00:00+00:00",
+    } for i in range(n)]
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--items", type=int, default=100_000)
+    args = ap.parse_args()
+
+    import ingest
+    with tempfile.TemporaryDirectory() as d:
+        rows = make_rows(args.items)
+        js = Path(d) / "kernelcut_20250101T000000Z.json"
+        js.write_text(json.dumps(rows), encoding="utf-8")
+        arrow = js.with_suffix(".arrow")
+        ingest.write_arrow(rows, arrow)
+        del rows
+        print(f"{args.items} items; json {js.stat().st_size / 2**20:.1f} MiB, arrow {arrow.stat().st_size / 2**20:.1f} MiB")
+        # read = file -> DataFrame only; load_df = full normalization; rss = peak growth over imports
+        print(f"{'format':>7} {'read_s':>8} {'load_df_s':>10} {'read_rss_mb':>12} {'peak_rss_mb':>12} {'raw_df_mb':>10}")
+        for p in (js, arrow):
+            out = subprocess.check_output([sys.executable, "-c", PROBE.format(root=str(ROOT), path=str(p))], text=True)
+            read_s, load_s, read_rss, peak, mem = out.split()
+            print(f"{p.suffix[1:]:>7} {read_s:>8} {load_s:>10} {read_rss:>12} {peak:>12} {mem:>10}")
+
+if __name__ == "__main__":
+    main()
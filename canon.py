@@ -0,0 +1,49 @@
+# canon.py
+"""One set of URL canonicalization rules for ingest (per item) and transform (per column)."""
+from __future__ import annotations
+from functools import lru_cache
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import hashlib, re
+
+# tracking params dropped so dedupe works across sources
+TRACKING_KEYS = {"ref", "ref_src", "ncid", "fbclid", "gclid", "mc_cid", "mc_eid"}
+TRACKING_PREFIX = re.compile(r"(?i)^utm_")
+CACHE_SIZE = 65_536
+
+def is_tracking(key: str) -> bool:
+    return key.lower() in TRACKING_KEYS or bool(TRACKING_PREFIX.match(key))
+
+def url_hash(url: str) -> str:
+    return hashlib.sha1((url or "").encode()).hexdigest()
+
+@lru_cache(maxsize=CACHE_SIZE)
+def canonicalize_one(url: str) -> tuple[str, str, str]:
+    """url -> (link_norm, domain, sha1(link_norm)); scheme/host lowercased, fragment dropped."""
+    url = (url or "").strip()
+    if not url:
+        return "", "", url_hash("")
+    try:
+        u = urlsplit(url)
+        query = u.query
+        if query:
+            query = urlencode([(k, v) for k, v in parse_qsl(query, keep_blank_values=True) if not is_tracking(k)], doseq=True)
+        norm = urlunsplit((u.scheme.lower(), u.netloc.lower(), u.path, query, ""))
+        domain = u.netloc.lower()
+    except Exception:
+        norm, domain = url, ""
+    return norm, domain, url_hash(norm)
+
+def canonical_url(url: str) -> str:
+    return canonicalize_one(url)[0]
+
+def canonicalize(links):
+    """
+    Vectorized form for a pandas Series of links: each distinct link is canonicalized once
+    (and memoized across calls), then broadcast back. Returns link_norm / domain / link_hash.
+    """
+    import pandas as pd
+    codes, uniques = pd.factorize(links.fillna("").astype(str), sort=False)
+    out = pd.DataFrame([canonicalize_one(u) for u in uniques], columns=["link_norm", "domain", "link_hash"])
+    if out.empty:
+        out = pd.DataFrame(columns=["link_norm", "domain", "link_hash"], dtype=object)
+    return out.take(codes).set_axis(links.index)
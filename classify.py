@@ -0,0 +1,132 @@
+# classify.py
+"""
+Digest curation rules as one compiled matcher.
+
+Every keyword (topic categories, tech allow-list, ban list) goes into a single regex,
+factored into a prefix trie and anchored on word boundaries — "ai" no longer matches
+inside "said". Keywords match as whole words with an optional plural ("gpu" -> "GPUs",
+"breach" -> "breaches"); a trailing "*" makes one a stem ("vuln*" -> "vulnerability").
+Title, summary and domain are lowercased and stacked into one column for a single
+regex pass; every hit maps to a bitmask of its keyword's labels, OR-reduced per row with
+np.bitwise_or.reduceat, so flags and the category are integer ops on arrays and cost
+stays flat as the keyword lists grow.
+"""
+from __future__ import annotations
+from functools import reduce
+from operator import or_
+import re
+import numpy as np
+import pandas as pd
+
+KEYWORDS = {
+    "ai": ["ai","artificial intelligence","gpt","llm","openai","deepmind","transformer","agent"],
+    "dev": ["developer","sdk","api","framework","library","runtime","debug*","compiler","devops","docker","kubernetes"],
+    "security": ["vuln*","cve","xss","rce","security","breach","malware","ransom*"],
+    "research": ["paper","arxiv","preprint","dataset","benchmark"],
+    "hardware": ["cpu","gpu","chip","silicon","nvidia","amd","intel","raspberry","arduino"],
+    "data": ["data","warehouse","lakehouse","etl","elt","spark","parquet","duckdb"],
+    "cloud": ["aws","azure","gcp","cloud","serverless"],
+    "mobile": ["ios","android","swift","kotlin","mobile"],
+    "design": ["design","ux","ui","typography","figma"],
+    "business": ["raise","funding","acquire","acquisition","revenue","pricing","profit"],
+    "opensource": ["open source","oss","github","gitlab"],
+    "social": ["twitter","x.com","facebook","instagram","tiktok","reddit"],
+}
+
+# --- curated “TLDR-like” filters ---
+TECH_DOMAINS = {
+    "techmeme.com","tldr.tech","techcrunch.com","wired.com","theverge.com",
+    "zdnet.com","geekwire.com","engadget.com","vox.com","anandtech.com","arstechnica.com",
+    "aws.amazon.com","kubernetes.io","github.blog"
+}
+
+TECH_KEYWORDS = [
+    "ai","machine learning","llm","gpt","devops","cloud","serverless",
+    "api","benchmark","startup","infosec","security","datascience","developer","sdk","framework"
+]
+
+BAN_KEYWORDS = ["celebrit*","fashion","sale","coupon","horoscope","gossip","recipes","travel*"]
+
+def _labels() -> dict[str, frozenset]:
+    labels: dict[str, set] = {}
+    for cat, kws in KEYWORDS.items():
+        for k in kws:
+            labels.setdefault(k, set()).add(cat)
+    for k in TECH_KEYWORDS:
+        labels.setdefault(k, set()).add("tech")
+    for k in BAN_KEYWORDS:
+        labels.setdefault(k, set()).add("ban")
+    return {k: frozenset(v) for k, v in labels.items()}
+
+def trie_regex(words) -> str:
+    """Alternation factored on common prefixes ("a(?:i|pi|ws)"), far cheaper to match than a flat one."""
+    trie: dict = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def walk(node: dict) -> str:
+        alts = [re.escape(ch) + walk(sub) for ch, sub in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        if "" in node:  # a keyword ends here and longer ones continue
+            return (body if len(alts) > 1 else f"(?:{body})") + "?"
+        return body
+    return walk(trie)
+
+LABELS = _labels()
+CATEGORIES = list(KEYWORDS)  # priority order when a text hits several
+COLUMNS = [*CATEGORIES, "tech", "ban"]
+BIT = {label: 1 << i for i, label in enumerate(COLUMNS)}  # categories take the low bits, in priority order
+MASK = {k.rstrip("*"): sum(BIT[label] for label in labels) for k, labels in LABELS.items()}
+CATEGORY_BITS = sum(BIT[c] for c in CATEGORIES)
+WORDS = [k for k in LABELS if not k.endswith("*")]
+STEMS = [k[:-1] for k in LABELS if k.endswith("*")]
+# group 1: a whole word, plural allowed; group 2: a stem and whatever word it starts.
+# Case-sensitive on lowercased text: about twice as fast as re.IGNORECASE on a trie.
+PATTERN = re.compile(
+    r"(?<!\w)(?:(" + (trie_regex(WORDS) or "(?!)") + r")(?:e?s)?|(" + (trie_regex(STEMS) or "(?!)") + r")\w*)(?!\w)"
+)
+HIT_MASK = {**{(w, ""): MASK[w] for w in WORDS}, **{("", stem): MASK[stem] for stem in STEMS}}  # keyed by findall tuples
+# subdomains count: "www.wired.com" and "aws.amazon.com", but not "notwired.com"
+DOMAIN_PATTERN = re.compile(r"(?:^|\.)(?:" + "|".join(map(re.escape, sorted(TECH_DOMAINS))) + r")$")
+
+def label_bits(*columns: pd.Series) -> list[np.ndarray]:
+    """Per column, per row: the OR of the label bits of every keyword hit (one regex pass for all columns)."""
+    n = len(columns[0])
+    text = pd.Series(np.concatenate([c.fillna("").astype(str).to_numpy(dtype=object) for c in columns]))
+    # long form, one row per hit (like extractall, without its per-match Python loop), then OR per row
+    hits = text.str.lower().str.findall(PATTERN).explode().dropna()
+    bits = np.zeros(len(text), dtype=np.int64)
+    if len(hits):
+        masks = hits.map(HIT_MASK).to_numpy(dtype=np.int64)
+        rows = hits.index.to_numpy()
+        starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])  # explode keeps each row's hits together
+        bits[rows[starts]] = np.bitwise_or.reduceat(masks, starts)
+    return [bits[i * n:(i + 1) * n] for i in range(len(columns))]
+
+def classify(title: pd.Series, summary: pd.Series, domain: pd.Series) -> pd.DataFrame:
+    """
+    Per row: tech (keep for the digest), ban, category.
+    tech = curated domain, else no ban word and some tech word in title/summary;
+    category = first KEYWORDS topic hit in title/domain, else "default".
+    """
+    t, s, d = label_bits(title, summary, domain)
+    text = t | s
+    ban = (text & BIT["ban"]) != 0
+    tech_domain = domain.fillna("").astype(str).str.lower().str.contains(DOMAIN_PATTERN).to_numpy(dtype=bool)
+    topics = (t | d) & CATEGORY_BITS
+    first = np.log2(topics & -topics, where=topics > 0, out=np.zeros(len(topics))).astype(int)  # lowest set bit
+    return pd.DataFrame({
+        "tech": tech_domain | (~ban & ((text & BIT["tech"]) != 0)),
+        "ban": ban,
+        "category": np.where(topics > 0, np.array(CATEGORIES, dtype=object)[first], "default"),
+    }, index=title.index)
+
+def category_for(text: str) -> str:
+    """Scalar form of the category rule, for a single string."""
+    hit = reduce(or_, (HIT_MASK[m] for m in PATTERN.findall((text or "").lower())), 0)
+    return next((c for c in CATEGORIES if hit & BIT[c]), "default")
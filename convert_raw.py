@@ -0,0 +1,29 @@
+# convert_raw.py
+"""
+Convert existing data/raw JSON/NDJSON snapshots to Arrow IPC (memory-mappable).
+
+    python convert_raw.py              # convert every snapshot without an .arrow twin
+    python convert_raw.py --delete     # ... and drop the JSON original afterwards
+"""
+from pathlib import Path
+import argparse
+from ingest import write_arrow
+from transform import RAW_DIR, read_raw
+
+def convert(path: Path, delete: bool = False) -> Path:
+    out = path.with_suffix(".arrow")
+    write_arrow(read_raw(path), out)
+    if delete:
+        path.unlink()
+    return out
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--delete", action="store_true", help="remove the JSON snapshot once converted")
+    args = ap.parse_args()
+    todo = [p for p in sorted(RAW_DIR.glob("kernelcut_*"))
+            if p.suffix in (".json", ".ndjson") and not p.with_suffix(".arrow").exists()]
+    for p in todo:
+        out = convert(p, args.delete)
+        print(f"{p.name} -> {out.name}")
+    print(f"Converted {len(todo)} snapshot(s)")
@@ -2,20 +2,44 @@
 from __future__ import annotations
 from pathlib import Path
 from datetime import datetime, timezone
-import asyncio, json, hashlib, time, re
-from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+import argparse, asyncio, json, hashlib, multiprocessing, shutil, time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
 import httpx, feedparser
+from canon import canonical_url, url_hash  # shared with transform
+from itemindex import ItemIndex
+from telemetry import FeedMetrics
+import retention, telemetry
+
+# Optional: columnar snapshots (ingest.py --format arrow)
+try:
+    import pyarrow as pa, pyarrow.ipc  # pip install pyarrow
+except Exception:
+    pa = None
 
 RAW = Path("data/raw"); RAW.mkdir(parents=True, exist_ok=True)
 FEEDS_FILE = Path("feeds.txt")
+CACHE_DIR = Path("data/cache/feeds")  # per-feed validators + last normalized items
 
 USER_AGENT = "KernelcutBot/1.0 (+https://github.com/joaofsant/kernelcut)"
 TIMEOUT_S = 12.0
-MAX_CONN = 20
+MAX_CONN = 40
 RETRIES = 2  # total attempts = 1 + RETRIES
 
-# remove tracking params so dedupe funciona melhor
-TRACKING_KEYS = {"utm_source","utm_medium","utm_campaign","utm_term","utm_content","ref","fbclid","gclid","mc_cid","mc_eid"}
+# per-host politeness: several feeds share a host (theverge.com, arxiv.org, ...)
+HOST_CONN = 4             # concurrent requests per host
+HOST_RATE = 2.0           # token-bucket refill, requests/sec per host
+HOST_BURST = 4            # token-bucket capacity
+BREAKER_FAILS = 3         # consecutive failures before a host is skipped
+BREAKER_COOLDOWN_S = 120.0
+MAX_RETRY_AFTER_S = 30.0  # longer Retry-After => give up on this run
+
+# feedparser + norm_item are pure-Python CPU work; off the event loop unless "inline"
+PARSE_MODE = "inline"     # inline | thread | process
+PARSE_WORKERS = None      # None = os.cpu_count()
+ITEM_FIELDS = ("source", "title", "link", "summary", "published")
 
 def now_utc_iso() -> str:
     return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
@@ -23,14 +47,6 @@ def now_utc_iso() -> str:
 def safe_str(x) -> str:
     return "" if x is None else str(x)
 
-def canonical_url(url: str) -> str:
-    try:
-        u = urlparse(url)
-        qs = [(k,v) for k,v in parse_qsl(u.query, keep_blank_values=True) if k.lower() not in TRACKING_KEYS]
-        return urlunparse((u.scheme, u.netloc, u.path, u.params, urlencode(qs, doseq=True), ""))  # drop fragment
-    except Exception:
-        return url
-
 def norm_item(src: str, entry: dict) -> dict:
     # published UTC ISO
     published = None
@@ -64,49 +80,479 @@ def norm_item(src: str, entry: dict) -> dict:
         "published": published,  # ISO or None; transform() will coerce to UTC
     }
 
-async def fetch_once(client: httpx.AsyncClient, url: str) -> list[dict]:
-    r = await client.get(url, timeout=TIMEOUT_S, follow_redirects=True)
-    r.raise_for_status()
-    fp = feedparser.parse(r.content)
+# --- per-feed high-water marks: {"ts": [Y,m,d,H,M,S], "ids": [...ids at ts]} ---
+
+def entry_ts(e: dict) -> list | None:
+    t = e.get("published_parsed") or e.get("updated_parsed")
+    return list(t[:6]) if t else None
+
+def entry_id(e: dict) -> str:
+    return safe_str(e.get("id") or e.get("link"))
+
+def above_mark(ts: list | None, eid: str, mark: dict | None) -> bool:
+    if not mark or ts is None:
+        return True  # undated entries can't be ordered: flagged, mark_new() drops the known ones
+    return ts > mark["ts"] or (ts == mark["ts"] and eid not in mark["ids"])
+
+def advance_mark(entries, mark: dict | None) -> dict | None:
+    top, ids = (mark["ts"], set(mark["ids"])) if mark else (None, set())
+    for e in entries:
+        ts = entry_ts(e)
+        if ts is None or (top is not None and ts < top):
+            continue
+        if top is None or ts > top:
+            top, ids = ts, set()
+        ids.add(entry_id(e))
+    return {"ts": top, "ids": sorted(ids)} if top is not None else None
+
+def parse_feed(url: str, content: bytes, mark: dict | None = None) -> tuple[list[list], dict | None]:
+    """
+    Parse + normalize one feed body; rows come back as ITEM_FIELDS lists (cheap to pickle)
+    plus a trailing "undated" flag. With a mark, entries at or below it are dropped before
+    norm_item; returns the advanced mark.
+    """
+    fp = feedparser.parse(content)
     src = fp.feed.get("title") or url
-    return [norm_item(src, e) for e in fp.entries]
+    entries = fp.entries
+    if mark:
+        entries = [e for e in entries if above_mark(entry_ts(e), entry_id(e), mark)]
+    rows = [[*(it[k] for k in ITEM_FIELDS), entry_ts(e) is None] for e, it in ((e, norm_item(src, e)) for e in entries)]
+    return rows, advance_mark(entries, mark)
+
+def make_pool(mode: str = PARSE_MODE):
+    if mode == "process":
+        # spawn, not fork: main() holds the ItemIndex SQLite connection open meanwhile
+        return ProcessPoolExecutor(max_workers=PARSE_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    if mode == "thread":
+        return ThreadPoolExecutor(max_workers=PARSE_WORKERS)
+    if mode != "inline":
+        raise ValueError(f"unknown parse mode: {mode}")
+    return nullcontext()
+
+async def parse_items(url: str, content: bytes, pool: Executor | None = None,
+                      mark: dict | None = None, incremental: bool = False) -> tuple[list[dict], dict | None]:
+    """Items of one feed body; incremental ones carry "undated" for mark_new()."""
+    if pool is None:
+        rows, mark = parse_feed(url, content, mark)
+    else:
+        rows, mark = await asyncio.get_running_loop().run_in_executor(pool, parse_feed, url, content, mark)
+    if incremental:
+        return [{**dict(zip(ITEM_FIELDS, r)), "undated": r[-1]} for r in rows], mark
+    return [dict(zip(ITEM_FIELDS, r)) for r in rows], mark
+
+# --- conditional GET cache (ETag / Last-Modified / body hash) ---
+
+def cache_path(url: str) -> Path:
+    return CACHE_DIR / f"{hashlib.sha1(url.encode()).hexdigest()}.json"
+
+def load_cache(url: str) -> dict:
+    p = cache_path(url)
+    try:
+        return json.loads(p.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+def save_cache(url: str, entry: dict):
+    p = cache_path(url)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_suffix(".tmp")
+    tmp.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(p)  # atomic: a crash never leaves a half-written entry
+
+def commit_cache(pending: dict[str, dict]):
+    """Persist entries staged by incremental fetches (call after the snapshot is written)."""
+    for url, entry in pending.items():
+        save_cache(url, entry)
+    pending.clear()
+
+def conditional_headers(entry: dict, incremental: bool = False) -> dict:
+    # only worth asking for a 304 if we can serve the items ourselves
+    # (incremental runs answer a 304 with "nothing new")
+    if "items" not in entry and not incremental:
+        return {}
+    h = {}
+    if entry.get("etag"):
+        h["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        h["If-Modified-Since"] = entry["last_modified"]
+    return h
+
+# --- per-host limits, Retry-After and circuit breaker ---
+
+class RetryLater(Exception):
+    """Server asked us to back off (429/503), `delay` in seconds."""
+    def __init__(self, status: int, delay: float | None):
+        super().__init__(f"HTTP {status}, retry after {delay}")
+        self.delay = delay
+
+def retry_after(r: httpx.Response) -> float | None:
+    v = (r.headers.get("retry-after") or "").strip()
+    if not v:
+        return None
+    if v.isdigit():
+        return float(v)
+    try:
+        return max(0.0, (parsedate_to_datetime(v) - datetime.now(timezone.utc)).total_seconds())
+    except Exception:
+        return None
+
+def host_of(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+class HostGate:
+    """Semaphore + token bucket + circuit breaker shared by all feeds of one host."""
+    def __init__(self):
+        self.sem = asyncio.Semaphore(HOST_CONN)
+        self.lock = asyncio.Lock()
+        self.tokens = float(HOST_BURST)
+        self.stamp = time.monotonic()
+        self.resume_at = 0.0   # set by Retry-After, applies to the whole host
+        self.fails = 0
+        self.open_until = 0.0
+
+    @property
+    def is_open(self) -> bool:
+        return time.monotonic() < self.open_until
 
-async def fetch_feed(client: httpx.AsyncClient, url: str) -> list[dict]:
-    # simple retries with backoff
+    async def take(self) -> bool:
+        """Wait for a request slot; False if the host was closed meanwhile (see close_for)."""
+        async with self.lock:
+            while True:
+                if self.is_open:
+                    return False
+                now = time.monotonic()
+                if now < self.resume_at:
+                    await asyncio.sleep(self.resume_at - now)
+                    continue
+                self.tokens = min(HOST_BURST, self.tokens + (now - self.stamp) * HOST_RATE)
+                self.stamp = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                await asyncio.sleep((1 - self.tokens) / HOST_RATE)
+
+    def pause(self, delay: float):
+        self.resume_at = max(self.resume_at, time.monotonic() + delay)
+
+    def close_for(self, delay: float):
+        """Retry-After too long to wait out in this run: send nothing to the host until it passes."""
+        self.pause(delay)
+        self.open_until = max(self.open_until, time.monotonic() + delay)
+
+    def ok(self):
+        self.fails = 0
+
+    def failed(self):
+        self.fails += 1
+        if self.fails >= BREAKER_FAILS:
+            self.open_until = time.monotonic() + BREAKER_COOLDOWN_S
+
+async def fetch_once(client: httpx.AsyncClient, url: str, pool: Executor | None = None,
+                     pending: dict[str, dict] | None = None, m: FeedMetrics | None = None) -> list[dict]:
+    """
+    pending=None: full fetch, cache entry saved right away.
+    pending={}: incremental — only entries above the feed's high-water mark are returned and the
+    new entry (validators + advanced mark) is staged in `pending` for commit_cache().
+    """
+    m = m or FeedMetrics(url)
+    incremental = pending is not None
+    prev = load_cache(url)
+    r = await client.get(url, timeout=TIMEOUT_S, follow_redirects=True,
+                         headers=conditional_headers(prev, incremental), extensions={"trace": m.trace})
+    m.status, m.bytes = r.status_code, m.bytes + r.num_bytes_downloaded
+    if r.status_code == 304 and (incremental or "items" in prev):
+        m.outcome = "not_modified"
+        return [] if incremental else prev["items"]
+    if r.status_code in (429, 503):
+        raise RetryLater(r.status_code, retry_after(r))
+    r.raise_for_status()
+
+    body_hash = hashlib.sha1(r.content).hexdigest()
+    if body_hash == prev.get("hash") and (incremental or "items" in prev):
+        # server ignores validators but body is identical: skip parsing
+        m.outcome = "unchanged"
+        return [] if incremental else prev["items"]
+
+    entry = {
+        "etag": r.headers.get("etag"),
+        "last_modified": r.headers.get("last-modified"),
+        "hash": body_hash,
+    }
+    t0 = time.perf_counter()
+    if incremental:
+        items, entry["mark"] = await parse_items(url, r.content, pool, prev.get("mark"), incremental=True)
+        pending[url] = entry  # no "items": they're only the slice above the mark
+    else:
+        items, _ = await parse_items(url, r.content, pool)
+        entry.update(items=items, mark=prev.get("mark"))
+        save_cache(url, entry)
+    m.parse_s, m.outcome = time.perf_counter() - t0, "ok"
+    return items
+
+async def fetch_feed(client: httpx.AsyncClient, url: str, gates: dict[str, HostGate] | None = None,
+                     pool: Executor | None = None, pending: dict[str, dict] | None = None,
+                     metrics: list[FeedMetrics] | None = None) -> list[dict]:
+    """Never raises; with `metrics`, one FeedMetrics per call records how the feed went."""
+    m = FeedMetrics(url, host_of(url))
+    t0 = time.perf_counter()
+    try:
+        items = await _fetch_feed(client, url, gates, pool, pending, m)
+        m.entries = len(items)
+        return items
+    finally:
+        m.total_s = time.perf_counter() - t0
+        if metrics is not None:
+            metrics.append(m)
+
+async def _fetch_feed(client, url, gates, pool, pending, m: FeedMetrics) -> list[dict]:
+    gate = (gates if gates is not None else {}).setdefault(m.host, HostGate())
     for attempt in range(RETRIES + 1):
+        if gate.is_open:
+            m.outcome = "breaker_open"
+            return []  # host keeps failing: don't spend retries on it
+        m.attempts = attempt + 1
         try:
-            return await fetch_once(client, url)
-        except Exception:
-            if attempt >= RETRIES:
+            async with gate.sem:
+                if not await gate.take():
+                    m.outcome = "breaker_open"
+                    return []
+                items = await fetch_once(client, url, pool, pending, m)
+            gate.ok()
+            m.error = None
+            return items
+        except RetryLater as e:
+            gate.failed()
+            m.error = type(e).__name__
+            delay = 0.8 * (2 ** attempt) if e.delay is None else e.delay
+            if delay > MAX_RETRY_AFTER_S:
+                gate.close_for(delay)  # the host's other feeds would only get 429s too
+                m.outcome = "backoff"
                 return []
-            await asyncio.sleep(0.8 * (2 ** attempt))
+            gate.pause(delay)
+        except httpx.HTTPStatusError as e:
+            m.error = type(e).__name__
+            if e.response.status_code < 500:
+                return []  # 4xx won't fix itself with a retry
+            gate.failed()
+            delay = 0.8 * (2 ** attempt)
+        except Exception as e:
+            m.error = type(e).__name__
+            gate.failed()
+            delay = 0.8 * (2 ** attempt)
+        if attempt >= RETRIES:
+            return []
+        await asyncio.sleep(delay)
 
-async def run() -> list[dict]:
+def load_urls() -> list[str]:
     if not FEEDS_FILE.exists():
         raise SystemExit("feeds.txt missing. Create it with one RSS/Atom URL per line.")
     urls = [u.strip() for u in FEEDS_FILE.read_text().splitlines() if u.strip() and not u.strip().startswith("#")]
     if not urls:
         raise SystemExit("feeds.txt is empty.")
+    return urls
 
+def make_client() -> httpx.AsyncClient:
     limits = httpx.Limits(max_connections=MAX_CONN, max_keepalive_connections=MAX_CONN//2)
-    async with httpx.AsyncClient(limits=limits, headers={"User-Agent": USER_AGENT}) as client:
-        results = await asyncio.gather(*[fetch_feed(client, u) for u in urls])
+    return httpx.AsyncClient(limits=limits, headers={"User-Agent": USER_AGENT})
+
+def link_hash(it: dict) -> str:
+    return url_hash(it.get("link") or "")
+
+def mark_new(items: list[dict], index: ItemIndex | None, new_only: bool = False) -> list[dict]:
+    """
+    Flag items never seen in an earlier run (`is_new`); with new_only, drop the rest.
+    Undated items from incremental fetches pass every high-water mark, so known ones are
+    dropped here (still staged, which keeps them in the index while the feed lists them).
+    Without an index there's nothing to check: items pass unflagged.
+    """
+    if index is None:
+        for it in items:
+            it.pop("undated", None)
+        return items
+    fresh = index.check(link_hash(it) for it in items)
+    out = []
+    for it in items:
+        it["is_new"] = link_hash(it) in fresh
+        undated = it.pop("undated", False)
+        if it["is_new"] or not (new_only or undated):
+            out.append(it)
+    return out
+
+async def run(urls: list[str] | None = None, parse_mode: str = PARSE_MODE,
+              index: ItemIndex | None = None, new_only: bool = False,
+              pending: dict[str, dict] | None = None, metrics: list[FeedMetrics] | None = None) -> list[dict]:
+    urls = urls or load_urls()
+    with make_pool(parse_mode) as pool:
+        async with make_client() as client:
+            gates: dict[str, HostGate] = {}
+            results = await asyncio.gather(*[fetch_feed(client, u, gates, pool, pending, metrics) for u in urls])
 
     rows = [it for sub in results for it in sub]
 
     # dedupe by canonical link (sha1)
     seen, uniq = set(), []
     for it in rows:
-        h = hashlib.sha1((it.get("link") or "").encode()).hexdigest()
+        h = link_hash(it)
         if h in seen:
             continue
         seen.add(h)
         uniq.append(it)
-    return uniq
+    return mark_new(uniq, index, new_only)
+
+async def run_stream(out: Path, urls: list[str] | None = None, parse_mode: str = PARSE_MODE,
+                     index: ItemIndex | None = None, new_only: bool = False,
+                     pending: dict[str, dict] | None = None, metrics: list[FeedMetrics] | None = None) -> int:
+    """Append deduped items as NDJSON while feeds complete; rename `out.part` -> `out` at the end."""
+    urls = urls or load_urls()
+    part = out.with_name(out.name + ".part")
+    seen, n = set(), 0
+    try:
+        with make_pool(parse_mode) as pool, part.open("w", encoding="utf-8") as f:
+            async with make_client() as client:
+                gates: dict[str, HostGate] = {}
+                for fut in asyncio.as_completed([fetch_feed(client, u, gates, pool, pending, metrics) for u in urls]):
+                    batch = []
+                    for it in await fut:
+                        h = link_hash(it)
+                        if h in seen:
+                            continue
+                        seen.add(h)
+                        batch.append(it)
+                    batch = mark_new(batch, index, new_only)
+                    for it in batch:
+                        f.write(json.dumps(it, ensure_ascii=False) + "\n")
+                        n += 1
+                    f.flush()  # readers tailing the .part see whole feeds
+        part.replace(out)
+    except BaseException:
+        part.unlink(missing_ok=True)
+        raise
+    return n
+
+def write_arrow(rows: list[dict], out: Path):
+    """Uncompressed Arrow IPC file (Feather v2), so transform can memory-map it."""
+    if pa is None:
+        raise SystemExit("pyarrow not installed. pip install pyarrow")
+    extra = [k for k in dict.fromkeys(k for r in rows for k in r) if k not in ITEM_FIELDS]
+    schema = pa.schema([(k, pa.string()) for k in ITEM_FIELDS] +
+                       [(k, pa.bool_() if k == "is_new" else pa.string()) for k in extra])
+    table = pa.Table.from_pylist(rows, schema=schema)
+    tmp = out.with_name(out.name + ".part")
+    with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, schema) as w:
+        w.write_table(table)
+    tmp.replace(out)
+
+# --- sharded mode: N processes, one event loop + client each ---
+
+def shard_of(url: str, n: int) -> int:
+    # shard by host so per-host limits still hold inside one process
+    return int(hashlib.sha1(host_of(url).encode()).hexdigest()[:8], 16) % n
+
+def ingest_shard(out: Path, urls: list[str], parse_mode: str, new_only: bool,
+                 incremental: bool) -> tuple[int, dict | None, list[str], list[FeedMetrics]]:
+    """Worker: stream one shard to `out`; returns (items, staged cache entries, staged index hashes, metrics)."""
+    pending, metrics = ({} if incremental else None), []
+    with ItemIndex() as index:
+        n = asyncio.run(run_stream(out, urls, parse_mode, index, new_only, pending, metrics))
+        return n, pending, sorted(index.pending), metrics
+
+def merge_shards(shards: list[Path], out_dir: Path) -> int:
+    """Cross-shard canonical-link dedupe: shard-XX -> part-XXX, then write the manifest."""
+    seen, parts, n = set(), [], 0
+    for i, shard in enumerate(shards):
+        dst = out_dir / f"part-{i:03d}.ndjson"
+        with shard.open(encoding="utf-8") as src, dst.open("w", encoding="utf-8") as f:
+            for line in src:
+                h = link_hash(json.loads(line))
+                if h in seen:
+                    continue
+                seen.add(h)
+                f.write(line)
+                n += 1
+        shard.unlink()
+        parts.append(dst.name)
+    (out_dir / "_manifest.json").write_text(json.dumps({"parts": parts, "items": n}), encoding="utf-8")
+    return n
+
+def run_sharded(out: Path, shards: int, parse_mode: str = PARSE_MODE, new_only: bool = False,
+                incremental: bool = False, metrics: list[FeedMetrics] | None = None) -> tuple[int, dict, set[str]]:
+    """Write a multi-file snapshot directory `out` (renamed into place once merged)."""
+    buckets: list[list[str]] = [[] for _ in range(shards)]
+    for u in load_urls():
+        buckets[shard_of(u, shards)].append(u)
+
+    tmp = out.with_name(out.name + ".tmp")
+    tmp.mkdir(parents=True)
+    files = [tmp / f"shard-{i:02d}.ndjson" for i in range(shards)]
+    pending, hashes = {}, set()
+    try:
+        with ProcessPoolExecutor(max_workers=shards) as ex:
+            futs = [ex.submit(ingest_shard, f, b, parse_mode, new_only, incremental)
+                    for f, b in zip(files, buckets) if b]
+            for fut in futs:
+                _, p, h, m = fut.result()
+                pending.update(p or {})
+                hashes.update(h)
+                if metrics is not None:
+                    metrics += m
+        n = merge_shards([f for f in files if f.exists()], tmp)
+        tmp.replace(out)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return n, pending, hashes
+
+def main(argv: list[str] | None = None) -> Path:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--stream", action="store_true", help="write NDJSON as each feed completes (bounded memory)")
+    ap.add_argument("--parse", default=PARSE_MODE, choices=["inline","thread","process"], help="where feedparser runs")
+    ap.add_argument("--new-only", action="store_true", help="emit only items not seen in earlier runs")
+    ap.add_argument("--incremental", action="store_true", help="skip entries at/below each feed's high-water mark")
+    ap.add_argument("--shards", type=int, default=1, help="split feeds over N worker processes (multi-file snapshot)")
+    ap.add_argument("--format", default="json", choices=["json","arrow"], help="snapshot format (arrow needs pyarrow)")
+    args = ap.parse_args(argv)
+    if args.format == "arrow" and (args.stream or args.shards > 1):
+        ap.error("--format arrow writes one file; don't combine with --stream/--shards")
 
-if __name__ == "__main__":
-    rows = asyncio.run(run())
     ts = now_utc_iso()
-    out = RAW / f"kernelcut_{ts}.json"
-    out.write_text(json.dumps(rows, ensure_ascii=False), encoding="utf-8")
-    print(f"Saved {len(rows)} items -> {out}")
\ No newline at end of file
+    pending = {} if args.incremental else None
+    metrics: list[FeedMetrics] = []
+    opts = dict(parse_mode=args.parse, new_only=args.new_only, pending=pending, metrics=metrics)
+    if args.shards > 1:
+        # before opening the index: SQLite connections must not be open across the workers' fork
+        out = RAW / f"kernelcut_{ts}.shards"
+        n, staged, hashes = run_sharded(out, args.shards, args.parse, args.new_only, args.incremental, metrics)
+        if pending is not None:
+            pending.update(staged)
+    with ItemIndex() as index:
+        if args.shards > 1:
+            index.pending |= hashes
+        elif args.stream:
+            out = RAW / f"kernelcut_{ts}.ndjson"
+            n = asyncio.run(run_stream(out, index=index, **opts))
+        else:
+            rows = asyncio.run(run(index=index, **opts))
+            out = RAW / f"kernelcut_{ts}.{args.format}"
+            if args.format == "arrow":
+                write_arrow(rows, out)
+            else:
+                out.write_text(json.dumps(rows, ensure_ascii=False), encoding="utf-8")
+            n = len(rows)
+        # only now is it safe to remember these items / advance the marks
+        index.commit()
+        index.evict()
+        if pending:
+            commit_cache(pending)
+    print(f"Saved {n} items -> {out}")
+    telemetry.write(metrics, ts)
+    failed = sum(m.outcome not in ("ok", "not_modified", "unchanged") for m in metrics)
+    if failed:
+        print(f"{failed}/{len(metrics)} feeds failed (python telemetry.py for details)")
+    retention.register(out)
+    archived, dropped = retention.apply()
+    if archived or dropped:
+        print(f"Retention: archived {archived}, dropped {dropped} old snapshot(s)")
+    return out
+
+if __name__ == "__main__":
+    main()
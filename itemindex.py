@@ -0,0 +1,70 @@
+# itemindex.py
+from __future__ import annotations
+from pathlib import Path
+import sqlite3, time
+
+INDEX_DB = Path("data/index/items.sqlite")
+RETENTION_DAYS = 30   # items not seen in any feed for this long are forgotten
+CHUNK = 500           # stay well below SQLite's bound-parameter limit
+
+class ItemIndex:
+    """
+    Cross-run dedupe index: sha1(canonical link) -> first_seen / last_seen (unix seconds).
+    check() only stages hashes; commit() them once the snapshot is safely on disk.
+    """
+    def __init__(self, path: Path = INDEX_DB):
+        self.pending: set[str] = set()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS items ("
+            " h TEXT PRIMARY KEY, first_seen INTEGER NOT NULL, last_seen INTEGER NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS items_last_seen ON items(last_seen)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.db.close()
+
+    def known(self, hashes) -> set[str]:
+        hashes, out = list(hashes), set()
+        for i in range(0, len(hashes), CHUNK):
+            part = hashes[i:i + CHUNK]
+            q = f"SELECT h FROM items WHERE h IN ({','.join('?' * len(part))})"
+            out.update(h for (h,) in self.db.execute(q, part))
+        return out
+
+    def check(self, hashes) -> set[str]:
+        """Return the hashes never seen before; all of them are staged for commit()."""
+        hashes = set(hashes)
+        self.pending |= hashes
+        return hashes - self.known(hashes)
+
+    def commit(self, now: int | None = None):
+        self.record(self.pending, now)
+        self.pending.clear()
+
+    def record(self, hashes, now: int | None = None):
+        now = int(now if now is not None else time.time())
+        with self.db:
+            self.db.executemany(
+                "INSERT INTO items(h, first_seen, last_seen) VALUES (?, ?, ?)"
+                " ON CONFLICT(h) DO UPDATE SET last_seen = excluded.last_seen",
+                ((h, now, now) for h in hashes),
+            )
+
+    def evict(self, days: float = RETENTION_DAYS, now: int | None = None) -> int:
+        now = int(now if now is not None else time.time())
+        with self.db:
+            cur = self.db.execute("DELETE FROM items WHERE last_seen < ?", (now - int(days * 86400),))
+        return cur.rowcount
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM items").fetchone()[0]
@@ -0,0 +1,85 @@
+# neardup.py
+"""
+Near-duplicate story detection: MinHash over title + summary word shingles, banded LSH.
+Cost is linear in rows (signatures in chunks, one np.unique per band), no pairwise pass.
+"""
+from __future__ import annotations
+import re, zlib
+import numpy as np
+import pandas as pd
+
+NUM_PERM = 64
+BANDS = 16            # 16 bands x 4 rows: pairs with Jaccard >~0.5 usually share a bucket
+THRESHOLD = 0.5       # estimated Jaccard (signature agreement) needed to merge a candidate pair
+SUMMARY_WORDS = 40    # headline + lede is enough; long summaries differ per outlet
+CHUNK = 2_000         # docs per signature batch (bounds the perm x shingles matrix)
+
+# multiply-shift hashing: (a*h + b) mod 2**64 (numpy wraps), keep the high 32 bits
+_rng = np.random.default_rng(1)
+_A = (_rng.integers(0, 1 << 63, NUM_PERM, dtype=np.uint64) | np.uint64(1))[:, None]
+_B = _rng.integers(0, 1 << 63, NUM_PERM, dtype=np.uint64)[:, None]
+_SHIFT = np.uint64(32)
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+WORD = re.compile(r"\w+")
+
+def shingles(title: str, summary: str, i: int) -> list[int]:
+    words = WORD.findall(f"{title or ''} {' '.join((summary or '').split()[:SUMMARY_WORDS])}".lower())
+    grams = [f"{a} {b}" for a, b in zip(words, words[1:])] or words or [f"\0{i}"]  # empty doc: unique shingle
+    return [zlib.crc32(g.encode()) for g in set(grams)]
+
+def signatures(titles, summaries) -> np.ndarray:
+    docs = [shingles(t, s, i) for i, (t, s) in enumerate(zip(titles, summaries))]
+    sig = np.empty((len(docs), NUM_PERM), dtype=np.uint64)
+    for start in range(0, len(docs), CHUNK):
+        batch = docs[start:start + CHUNK]
+        h = np.fromiter((x for d in batch for x in d), dtype=np.uint64)
+        offsets = np.cumsum([0] + [len(d) for d in batch[:-1]])
+        vals = (_A * h[None, :] + _B) >> _SHIFT
+        sig[start:start + len(batch)] = np.minimum.reduceat(vals, offsets, axis=1).T
+    return sig
+
+def clusters(sig: np.ndarray) -> np.ndarray:
+    """
+    Union-find root per row over LSH candidates that pass the THRESHOLD check
+    (which also weeds out bucket-key collisions).
+    """
+    n = len(sig)
+    parent = np.arange(n)
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    rows = NUM_PERM // BANDS
+    for b in range(BANDS):
+        key = np.zeros(n, dtype=np.uint64)
+        for c in range(b * rows, (b + 1) * rows):  # fold the band into one bucket key
+            key = (key ^ sig[:, c]) * _MIX
+        _, first, inv = np.unique(key, return_index=True, return_inverse=True)
+        leader = first[inv]
+        cand = np.nonzero(leader != np.arange(n))[0]
+        if not len(cand):
+            continue
+        ok = (sig[cand] == sig[leader[cand]]).mean(axis=1) >= THRESHOLD
+        for i, j in zip(cand[ok], leader[cand[ok]]):
+            ri, rj = find(i), find(j)
+            if ri != rj:
+                parent[max(ri, rj)] = min(ri, rj)
+    return np.array([find(i) for i in range(n)])
+
+def collapse(df: pd.DataFrame, by: str = "score") -> pd.DataFrame:
+    """
+    Keep the best-`by` row of each near-duplicate cluster. Adds dup_cluster (link_hash of the
+    kept row) and dup_count (cluster size) so the digest can say "also covered by N outlets".
+    """
+    if df.empty:
+        return df.assign(dup_cluster=pd.Series(dtype=object), dup_count=pd.Series(dtype="int64"))
+    roots = clusters(signatures(df["title"].tolist(), df["summary"].fillna("").tolist()))
+    df = df.reset_index(drop=True).assign(_root=roots)
+    df["dup_count"] = df.groupby("_root")["_root"].transform("size").astype("int64")
+    df = df.loc[df.groupby("_root")[by].idxmax().sort_values().values]  # ties: earliest row wins
+    key = "link_hash" if "link_hash" in df.columns else "link_norm"
+    df["dup_cluster"] = df[key]
+    return df.drop(columns="_root")
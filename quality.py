@@ -10,6 +10,6 @@ def validate(df):
     assert df["link"].notna().mean() > 0.95, "Too many missing links"
 
 if __name__ == "__main__":
-    df = transform()
+    df = transform(window="today")  # what storage.py stores; shares its cached frame
     validate(df)
     print("Quality: OK ✅")
\ No newline at end of file
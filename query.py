@@ -0,0 +1,98 @@
+# query.py
+"""
+Read side of data/processed: only the files, columns and row groups a question needs.
+
+    query(start="2025-01-04", columns=["title", "domain", "score"],
+          filters=[("domain", "in", ["arxiv.org"]), ("score", ">", 0.5)])
+
+Pruning happens in three steps: partitions by date range (from the manifest, no directory
+listing), files by their recorded published/fetch_ts ranges, then row groups by parquet
+min/max statistics. Surviving rows are filtered exactly in pandas. Filters use the
+(column, op, value) form of fastparquet/pyarrow and are ANDed.
+"""
+from __future__ import annotations
+from typing import Iterator
+import operator
+import pandas as pd
+from fastparquet import ParquetFile
+import storage
+
+OPS = {
+    "==": operator.eq, "=": operator.eq, "!=": operator.ne,
+    "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+    "in": lambda s, v: s.isin(list(v)), "not in": lambda s, v: ~s.isin(list(v)),
+}
+RANGE_COLS = ("published", "fetch_ts")  # per-file min/max kept in the manifest
+
+def _day(x) -> str | None:
+    return None if x is None else pd.Timestamp(x).strftime("%Y-%m-%d")
+
+def _ts(x) -> pd.Timestamp:
+    t = pd.Timestamp(x)
+    return t.tz_localize("UTC") if t.tz is None else t
+
+def file_may_match(entry: dict, filters: list[tuple]) -> bool:
+    for col, op, val in filters:
+        if col not in RANGE_COLS or op not in ("<", "<=", ">", ">=", "==", "="):
+            continue
+        lo, hi = entry.get(f"{col}_min"), entry.get(f"{col}_max")
+        if lo is None:  # all-null column in this file: no comparison can match
+            return False
+        lo, hi, val = _ts(lo), _ts(hi), _ts(val)
+        if (op in ("<", "<=") and not OPS[op](lo, val)) or (op in (">", ">=") and not OPS[op](hi, val)) \
+                or (op in ("==", "=") and not lo <= val <= hi):
+            return False
+    return True
+
+def files(start=None, end=None, filters: list[tuple] | None = None) -> list[dict]:
+    """Manifest entries in write order whose partition lies in [start, end] and may hold matches."""
+    lo, hi = _day(start), _day(end)
+    return [
+        f for f in storage.load_manifest()["files"]
+        if (lo is None or f["date"] >= lo) and (hi is None or f["date"] <= hi)
+        and file_may_match(f, filters or [])
+    ]
+
+def stats_filters(filters: list[tuple]) -> list[tuple]:
+    # parquet min/max of tz-aware columns are naive UTC
+    return [(c, op, _ts(v).tz_convert(None) if c in RANGE_COLS and not op.endswith("in") else v)
+            for c, op, v in filters]
+
+def apply_filters(df: pd.DataFrame, filters: list[tuple]) -> pd.DataFrame:
+    if not filters or df.empty:
+        return df
+    mask = pd.Series(True, index=df.index)
+    for col, op, val in filters:
+        if col in RANGE_COLS and not op.endswith("in"):
+            val = _ts(val)
+        mask &= OPS[op](df[col], val).fillna(False)
+    return df[mask]
+
+def scan(start=None, end=None, columns: list[str] | None = None,
+         filters: list[tuple] | None = None) -> Iterator[pd.DataFrame]:
+    """
+    Matching rows one row group at a time, in write order. Batches are not upserted:
+    an older version of a link can appear alongside its replacement (see query()).
+    """
+    filters = list(filters or [])
+    need = None if columns is None else list(dict.fromkeys([*columns, *(c for c, _, _ in filters)]))
+    for entry in files(start, end, filters):
+        pf = ParquetFile(str(storage.PROC_DIR / entry["path"]))
+        cols = None if need is None else [c for c in need if c in pf.columns]
+        for batch in pf.iter_row_groups(filters=stats_filters(filters) or None, columns=cols):
+            batch = apply_filters(batch, filters)
+            if len(batch):
+                yield batch if columns is None else batch[[c for c in columns if c in batch.columns]]
+
+def query(start=None, end=None, columns: list[str] | None = None,
+          filters: list[tuple] | None = None) -> pd.DataFrame:
+    """
+    scan() collected into one frame, upserted on storage.KEY among the matching rows
+    (exact once partitions are compacted).
+    """
+    key = storage.KEY
+    cols = None if columns is None else list(dict.fromkeys([*columns, key]))
+    df = storage.upsert(list(scan(start, end, cols, filters)))
+    if columns is not None:
+        df = df.reindex(columns=[c for c in columns if c in df.columns]) if len(df) else pd.DataFrame(columns=columns)
+    return df
@@ -0,0 +1,72 @@
+# rank.py
+"""
+Ranking engine: score = quality x 2^(-age / half_life).
+
+Ordering uses rank_key = log2(quality) + published_hours / half_life, which does not depend
+on "now" — keys from different runs compare directly and a TopK can absorb new batches.
+The 0..1 `score` is that key evaluated at an `as_of` time.
+"""
+from __future__ import annotations
+import re
+import numpy as np
+import pandas as pd
+
+GOOD_DOMAINS = {
+    "www.theverge.com","arstechnica.com","techcrunch.com","www.wired.com",
+    "www.nature.com","arxiv.org","spectrum.ieee.org","ai.googleblog.com",
+    "openai.com","deepmind.google","www.semanticscholar.org"
+}
+BLOCK_TITLE = re.compile(r"(?i)^(show\s*hn|ask\s*hn|who\s*is\s*hiring|launch\s*hn)\b")
+
+WEIGHTS = {
+    "half_life_h": 18.0,   # recency: score halves every N hours
+    "base": 0.55,          # quality before features
+    "title": 0.30,         # x min(len(title), TITLE_CAP) / TITLE_CAP
+    "good_domain": 0.20,   # GOOD_DOMAINS bonus
+    "block_title": 0.40,   # BLOCK_TITLE penalty (Show HN, Ask HN, ...)
+}
+TITLE_CAP = 120
+MIN_QUALITY = 1e-3         # keep log2 finite for fully penalized rows
+
+class Ranker:
+    def __init__(self, weights: dict | None = None, as_of: pd.Timestamp | None = None):
+        self.w = {**WEIGHTS, **(weights or {})}
+        self.as_of = as_of or pd.Timestamp.now(tz="UTC")
+
+    def quality(self, df: pd.DataFrame) -> pd.Series:
+        tlen = df["title"].str.len().fillna(0).clip(upper=TITLE_CAP) / TITLE_CAP
+        bonus = df["domain"].isin(GOOD_DOMAINS).astype(float)
+        penalty = df["title"].str.match(BLOCK_TITLE).fillna(False).astype(float)
+        q = self.w["base"] + self.w["title"] * tlen + self.w["good_domain"] * bonus - self.w["block_title"] * penalty
+        return q.clip(lower=MIN_QUALITY, upper=1.0)
+
+    def rank_key(self, df: pd.DataFrame) -> pd.Series:
+        # undated items count as published when fetched (or now)
+        fallback = df["fetch_ts"] if "fetch_ts" in df.columns else self.as_of
+        pub = df["published"].fillna(fallback).fillna(self.as_of)
+        hours = (pub - pd.Timestamp(0, tz="UTC")).dt.total_seconds() / 3600
+        return np.log2(self.quality(df)) + hours / self.w["half_life_h"]
+
+    def score_at(self, key: pd.Series) -> pd.Series:
+        now_h = (self.as_of - pd.Timestamp(0, tz="UTC")).total_seconds() / 3600
+        return np.exp2(key - now_h / self.w["half_life_h"]).clip(lower=0, upper=1)
+
+    def annotate(self, df: pd.DataFrame) -> pd.DataFrame:
+        key = self.rank_key(df)
+        return df.assign(rank_key=key, score=self.score_at(key))
+
+class TopK:
+    """Bounded best-k by rank_key; push() merges a batch in O(k + batch), no full re-sort."""
+    def __init__(self, k: int = 200, key: str = "rank_key"):
+        self.k, self.key = k, key
+        self.df: pd.DataFrame | None = None
+
+    def push(self, batch: pd.DataFrame) -> TopK:
+        if batch.empty:
+            return self
+        both = batch if self.df is None else pd.concat([self.df, batch], ignore_index=True)
+        self.df = both.nlargest(self.k, self.key, keep="first")
+        return self
+
+    def result(self) -> pd.DataFrame:
+        return pd.DataFrame() if self.df is None else self.df.reset_index(drop=True)
@@ -0,0 +1,254 @@
+# render.py
+"""
+Digest outputs from one view model: docs/digest.md, docs/index.html, docs/feed.json
+(JSON Feed 1.1) and docs/feed.xml (RSS 2.0).
+
+digest.py cleans and summarizes each pick once into an Item; every format is a template
+filled from the same Digest, so they can't drift apart. Templates are string.Template
+objects built at import (no brace doubling in the CSS/JS). A file is only replaced, via an
+atomic rename, when its content hash changed, so an identical rerun leaves docs/ (and the
+Pages deploy) alone.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, asdict
+from datetime import date, datetime, time, timezone
+from email.utils import format_datetime
+from html import escape
+from pathlib import Path
+from string import Template
+from xml.sax.saxutils import escape as xml_escape
+import hashlib, json, os, uuid
+
+DOCS = Path("docs")
+SITE_URL = "https://kernelcut.com/"  # docs/CNAME
+TITLE = "Kernelcut — Daily Tech Digest"
+TAGLINE = "Kernelcut slices the noise; keeps the signal."
+
+@dataclass(frozen=True)
+class Item:
+    title: str
+    link: str
+    domain: str
+    summary: str
+    category: str
+    emoji: str
+
+@dataclass(frozen=True)
+class Digest:
+    day: date
+    items: tuple[Item, ...]
+
+    @property
+    def today(self) -> str:
+        return self.day.strftime("%b %d, %Y")
+
+    @property
+    def published(self) -> datetime:
+        # day granularity: rerunning with the same picks renders byte-identical feeds
+        return datetime.combine(self.day, time(), timezone.utc)
+
+# -------- Markdown (speak.parse_digest reads this layout) --------
+MD_PAGE = Template("# Kernelcut\n**Daily Tech Digest — $today**\n\n$items\n---\n*$tagline*\n")
+MD_ITEM = Template("- $emoji [$title]($link) — _${domain}_")
+MD_SUMMARY = Template("  - $summary")
+
+def to_markdown(d: Digest) -> str:
+    lines = []
+    for it in d.items:
+        lines.append(MD_ITEM.substitute(asdict(it)))
+        if it.summary:
+            lines.append(MD_SUMMARY.substitute(summary=it.summary))
+    return MD_PAGE.substitute(today=d.today, items="\n".join(lines), tagline=TAGLINE)
+
+# -------- HTML --------
+HTML_CARD = Template("""
+    <div class="card">
+      <a class="title" href="$link" target="_blank" rel="noopener noreferrer">$emoji $title</a>
+      <div class="meta">
+        <span class="chip">$domain</span>
+        <button class="chip" data-play-idx="$idx" title="Listen to this article">▶ Listen</button>
+      </div>
+      <p class="summary">$summary</p>
+    </div>
+""")
+
+HTML_PAGE = Template("""<!doctype html>
+<html lang="en">
+<head>
+<meta charset="utf-8" />
+<meta name="viewport" content="width=device-width, initial-scale=1" />
+<title>$title</title>
+<link rel="alternate" type="application/feed+json" title="$title" href="feed.json" />
+<link rel="alternate" type="application/rss+xml" title="$title" href="feed.xml" />
+<style>
+  :root {
+    --bg:#fbfbfa; --page:#ffffff; --fg:#202124; --muted:#6b7280;
+    --border:#e5e7eb; --chip:#f3f4f6; --link:#111827;
+  }
+  @media (prefers-color-scheme: dark) {
+    :root { --bg:#0f1115; --page:#111319; --fg:#e5e7eb; --muted:#9ca3af;
+            --border:#262a33; --chip:#1a1e27; --link:#e5e7eb; }
+  }
+  * { box-sizing:border-box }
+  body { margin:0; background:var(--bg); color:var(--fg);
+         font:16px/1.6 ui-sans-serif,-apple-system,BlinkMacSystemFont,"Segoe UI",Inter,Roboto,Arial }
+  .page { max-width:840px; margin:48px auto; padding:48px 56px;
+          background:var(--page); border:1px solid var(--border); border-radius:16px }
+  h1 { margin:0 0 6px; font-size:34px; letter-spacing:-0.01em }
+  .subtitle { color:var(--muted); margin:0 0 24px }
+  .player { margin:10px 0 22px; padding:8px 12px; border:1px solid var(--border);
+            border-radius:10px; background:var(--chip); display:flex; gap:8px; align-items:center; flex-wrap:wrap }
+  .player button { padding:6px 10px; border:1px solid var(--border); background:#fff0; border-radius:8px; cursor:pointer }
+  .player .now { color:var(--muted); font-size:13px }
+  .card { padding:16px 18px; border:1px solid var(--border);
+          border-radius:12px; margin:12px 0 }
+  .title { color:var(--link); text-decoration:none; font-weight:600; border-bottom:1px solid transparent }
+  .title:hover { border-bottom-color:var(--link) }
+  .meta { margin-top:6px; display:flex; gap:8px; flex-wrap:wrap; align-items:center }
+  .chip { display:inline-block; font-size:12px; padding:4px 8px;
+          background:var(--chip); color:var(--muted);
+          border:1px solid var(--border); border-radius:999px; cursor:pointer }
+  .summary { margin:10px 0 0 }
+  footer { color:var(--muted); margin-top:28px; font-size:13px }
+</style>
+</head>
+<body>
+  <main class="page">
+    <h1>Kernelcut</h1>
+    <p class="subtitle"><strong>Daily Tech Digest</strong> — $today</p>
+
+    <div class="player" id="kc-player">
+      <button id="kc-prev">⏮︎ Prev</button>
+      <button id="kc-toggle">▶︎ Play</button>
+      <button id="kc-next">⏭︎ Next</button>
+      <span class="now" id="kc-now"></span>
+      <audio id="kc-audio" preload="metadata"></audio>
+    </div>
+$cards
+    <footer>$tagline</footer>
+  </main>
+
+  <script>
+  (function() {
+    const audio = document.getElementById('kc-audio');
+    const btn = document.getElementById('kc-toggle');
+    const prev = document.getElementById('kc-prev');
+    const next = document.getElementById('kc-next');
+    const now = document.getElementById('kc-now');
+    let list = [], idx = 0;
+
+    function load(i) {
+      if (!list.length) return;
+      idx = Math.max(0, Math.min(i, list.length-1));
+      const it = list[idx];
+      audio.src = it.src;
+      now.textContent = '(' + (idx+1) + '/' + list.length + ') ' + it.title;
+    }
+    function playIdx(i) { load(i); audio.play(); }
+
+    fetch('playlist.json')
+      .then(r => r.ok ? r.json() : [])
+      .then(items => { list = items || []; if (list.length) load(0); })
+      .catch(() => { list = []; });
+
+    btn.addEventListener('click', () => {
+      if (!audio.src) return;
+      if (audio.paused) { audio.play(); } else { audio.pause(); }
+    });
+    prev.addEventListener('click', () => playIdx((idx-1+list.length)%list.length));
+    next.addEventListener('click', () => playIdx((idx+1)%list.length));
+    audio.addEventListener('play',   () => { btn.textContent = '⏸︎ Pause'; });
+    audio.addEventListener('pause',  () => { btn.textContent = '▶︎ Play'; });
+    audio.addEventListener('ended',  () => next.click());
+
+    document.querySelectorAll('[data-play-idx]').forEach(el => {
+      el.addEventListener('click', () => {
+        const n = parseInt(el.getAttribute('data-play-idx'), 10) - 1;
+        playIdx(Math.max(0, n));
+      });
+    });
+  })();
+  </script>
+  <script src="player.js"></script>
+</body>
+</html>""")
+
+def to_html(d: Digest) -> str:
+    cards = "".join(
+        HTML_CARD.substitute({k: escape(v) for k, v in asdict(it).items()}, idx=i)
+        for i, it in enumerate(d.items, start=1)
+    )
+    return HTML_PAGE.substitute(title=escape(TITLE), today=d.today, cards=cards, tagline=escape(TAGLINE))
+
+# -------- feeds --------
+def to_json_feed(d: Digest) -> str:
+    published = d.published.isoformat()
+    feed = {
+        "version": "https://jsonfeed.org/version/1.1",
+        "title": TITLE,
+        "home_page_url": SITE_URL,
+        "feed_url": SITE_URL + "feed.json",
+        "description": TAGLINE,
+        "items": [
+            {"id": it.link, "url": it.link, "title": it.title, "content_text": it.summary or it.title,
+             "date_published": published, "tags": [it.category], "external_url": it.link}
+            for it in d.items
+        ],
+    }
+    return json.dumps(feed, ensure_ascii=False, indent=1) + "\n"
+
+RSS_ITEM = Template("""  <item>
+   <title>$title</title>
+   <link>$link</link>
+   <guid isPermaLink="true">$link</guid>
+   <description>$summary</description>
+   <category>$category</category>
+   <pubDate>$date</pubDate>
+  </item>
+""")
+
+RSS_PAGE = Template("""<?xml version="1.0" encoding="utf-8"?>
+<rss version="2.0">
+ <channel>
+  <title>$title</title>
+  <link>$site</link>
+  <description>$tagline</description>
+  <lastBuildDate>$date</lastBuildDate>
+$items </channel>
+</rss>
+""")
+
+def to_rss(d: Digest) -> str:
+    date_ = format_datetime(d.published)
+    items = "".join(
+        RSS_ITEM.substitute({k: xml_escape(v) for k, v in asdict(it).items()}, date=date_)
+        for it in d.items
+    )
+    return RSS_PAGE.substitute(title=xml_escape(TITLE), site=SITE_URL, tagline=xml_escape(TAGLINE),
+                               date=date_, items=items)
+
+FORMATS = {
+    "digest.md": to_markdown,
+    "index.html": to_html,
+    "feed.json": to_json_feed,
+    "feed.xml": to_rss,
+}
+
+def write_if_changed(path: Path, text: str) -> bool:
+    """Atomically replace `path` with `text` unless it already holds exactly that."""
+    data = text.encode("utf-8")
+    try:
+        if hashlib.sha1(path.read_bytes()).digest() == hashlib.sha1(data).digest():
+            return False
+    except OSError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+    return True
+
+def render(d: Digest, out_dir: Path | None = None) -> dict[str, bool]:
+    """Every format in one pass; name -> whether the file was (re)written."""
+    out_dir = out_dir or DOCS
+    return {name: write_if_changed(out_dir / name, fmt(d)) for name, fmt in FORMATS.items()}
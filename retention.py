@@ -0,0 +1,227 @@
+# retention.py
+"""
+Rolling retention for data/raw.
+
+Snapshots older than ARCHIVE_AFTER are streamed into one compressed archive per day
+(data/raw/archive/<YYYY-MM-DD>.gz or .zst): each snapshot is its own gzip member / zstd
+frame, so it can be read back alone from its (offset, length). archive/_index.json lists
+every snapshot, live or archived, in time order, so the newest one is found without a
+glob; it is rescanned only when data/raw's mtime shows something was added or removed
+behind its back. Whole days are then dropped, oldest first, to stay within MAX_BYTES /
+MAX_AGE. transform.py reads archived snapshots transparently.
+
+    python retention.py                      # archive + enforce the budget
+    python retention.py --archive-after 1 --max-gb 2 --max-age-days 90
+"""
+from __future__ import annotations
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+import argparse, hashlib, json, shutil, zlib
+
+# Optional: zstd archives (smaller and faster than gzip)
+try:
+    import zstandard as zstd  # pip install zstandard
+except Exception:
+    zstd = None
+
+RAW_DIR = Path("data/raw")
+ARCHIVE_AFTER = timedelta(days=2)     # live snapshots older than this get archived
+MAX_BYTES = 5 * 1024**3               # data/raw budget (live + archives)
+MAX_AGE = timedelta(days=180)         # archives older than this are dropped
+CODEC = "zstd" if zstd else "gzip"
+EXT = {"gzip": "gz", "zstd": "zst"}
+SUFFIXES = (".json", ".ndjson", ".shards", ".arrow")  # same set as transform.RAW_SUFFIXES
+CHUNK = 1 << 20
+
+def archive_dir(raw_dir: Path) -> Path:
+    return raw_dir / "archive"
+
+def index_path(raw_dir: Path) -> Path:
+    # lives under archive/ so rewriting it doesn't touch data/raw's own mtime
+    return archive_dir(raw_dir) / "_index.json"
+
+def snapshot_time(name: str) -> datetime:
+    stem = name.split(".", 1)[0].replace("kernelcut_", "")
+    return datetime.strptime(stem, "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc)
+
+def stored_suffix(name: str) -> str:
+    # a .shards directory is archived as its parts concatenated, i.e. one NDJSON stream
+    suffix = Path(name).suffix
+    return ".ndjson" if suffix == ".shards" else suffix
+
+def _dir_mtime(raw_dir: Path) -> int:
+    return raw_dir.stat().st_mtime_ns
+
+def _live(raw_dir: Path) -> list[str]:
+    return [p.name for p in raw_dir.glob("kernelcut_*") if p.suffix in SUFFIXES]
+
+def _save(raw_dir: Path, index: dict):
+    index["snapshots"].sort(key=lambda e: e["name"])
+    index["dir_mtime_ns"] = _dir_mtime(raw_dir)
+    p = index_path(raw_dir)
+    tmp = p.with_suffix(".tmp")
+    tmp.write_text(json.dumps(index, indent=1), encoding="utf-8")
+    tmp.replace(p)
+
+def _rescan(raw_dir: Path, index: dict | None) -> dict:
+    if index is None:  # lost index: archived entries come back from the per-archive sidecars
+        archived = [e for side in archive_dir(raw_dir).glob("*.json") if side.name != "_index.json"
+                    for e in json.loads(side.read_text(encoding="utf-8"))]
+    else:
+        archived = [e for e in index["snapshots"] if "archive" in e]
+    known = {e["name"] for e in archived}
+    index = {"snapshots": archived + [{"name": n} for n in _live(raw_dir) if n not in known]}
+    _save(raw_dir, index)
+    return index
+
+def load_index(raw_dir: Path | None = None) -> dict:
+    raw_dir = raw_dir or RAW_DIR
+    archive_dir(raw_dir).mkdir(parents=True, exist_ok=True)
+    p = index_path(raw_dir)
+    index = json.loads(p.read_text(encoding="utf-8")) if p.exists() else None
+    if index is None or index.get("dir_mtime_ns") != _dir_mtime(raw_dir):
+        index = _rescan(raw_dir, index)
+    return index
+
+def snapshots(raw_dir: Path | None = None) -> list[str]:
+    return [e["name"] for e in load_index(raw_dir)["snapshots"]]
+
+def entry(name: str, raw_dir: Path | None = None) -> dict | None:
+    return next((e for e in load_index(raw_dir)["snapshots"] if e["name"] == name), None)
+
+def register(path: Path):
+    """Record a snapshot ingest just wrote (keeps the index fresh without a rescan)."""
+    raw_dir = path.parent
+    index = load_index(raw_dir)  # rescans (and so includes `path`) if the dir changed since
+    if not any(e["name"] == path.name for e in index["snapshots"]):
+        index["snapshots"].append({"name": path.name})
+    _save(raw_dir, index)
+
+def read_archived(path: Path) -> tuple[bytes, str]:
+    """Decompressed bytes of an archived snapshot and the suffix of the stored format."""
+    raw_dir = path.parent
+    e = entry(path.name, raw_dir)
+    if e is None or "archive" not in e:
+        raise FileNotFoundError(path)
+    with (archive_dir(raw_dir) / e["archive"]).open("rb") as f:
+        f.seek(e["offset"])
+        data = f.read(e["length"])
+    if e["codec"] == "zstd":
+        if zstd is None:
+            raise SystemExit("zstandard not installed. pip install zstandard")
+        return zstd.ZstdDecompressor().decompressobj().decompress(data), e["stored"]
+    return zlib.decompress(data, 31), e["stored"]
+
+def source_files(path: Path) -> list[Path]:
+    """The files whose bytes make up a snapshot: a .shards directory's parts in sorted order (not its manifest)."""
+    if not path.is_dir():
+        return [path]
+    parts = json.loads((path / "_manifest.json").read_text(encoding="utf-8"))["parts"]
+    return [path / part for part in sorted(parts)]
+
+def _source_chunks(path: Path):
+    for p in source_files(path):
+        with p.open("rb") as f:
+            while chunk := f.read(CHUNK):
+                yield chunk
+
+def _compressor(codec: str):
+    if codec == "zstd":
+        return zstd.ZstdCompressor(level=10).compressobj()
+    return zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+
+def _append(raw_dir: Path, name: str, codec: str) -> dict:
+    day = snapshot_time(name).strftime("%Y-%m-%d")
+    dst = archive_dir(raw_dir) / f"{day}.{EXT[codec]}"
+    comp, sha, size = _compressor(codec), hashlib.sha1(), 0
+    with dst.open("ab") as out:
+        start = out.tell()
+        for chunk in _source_chunks(raw_dir / name):
+            sha.update(chunk)
+            size += len(chunk)
+            out.write(comp.compress(chunk))
+        out.write(comp.flush())
+        out.flush()
+        end = out.tell()
+    return {"name": name, "archive": dst.name, "offset": start, "length": end - start, "codec": codec,
+            "stored": stored_suffix(name), "size": size, "sha1": sha.hexdigest()}
+
+def _remove(p: Path):
+    shutil.rmtree(p) if p.is_dir() else p.unlink(missing_ok=True)
+
+def archive(after: timedelta = ARCHIVE_AFTER, now: datetime | None = None,
+            raw_dir: Path | None = None, codec: str = CODEC) -> int:
+    """
+    Move live snapshots older than `after` into their day's archive (never the newest).
+    The index (and the day's sidecar) is saved before originals are deleted, so a crash
+    leaves at worst some unreferenced bytes at the end of an archive.
+    """
+    raw_dir = raw_dir or RAW_DIR
+    now = now or datetime.now(timezone.utc)
+    index = load_index(raw_dir)
+    entries = index["snapshots"]
+    todo = [i for i, e in enumerate(entries[:-1]) if "archive" not in e and now - snapshot_time(e["name"]) > after]
+    if not todo:
+        return 0
+    for i in todo:
+        entries[i] = _append(raw_dir, entries[i]["name"], codec)
+    for side in {entries[i]["archive"] for i in todo}:
+        listed = [e for e in entries if e.get("archive") == side]
+        (archive_dir(raw_dir) / f"{side}.json").write_text(json.dumps(listed), encoding="utf-8")
+    _save(raw_dir, index)
+    for i in todo:
+        _remove(raw_dir / entries[i]["name"])
+    _save(raw_dir, index)  # record data/raw's new mtime
+    return len(todo)
+
+def _size(p: Path) -> int:
+    if p.is_dir():
+        return sum(f.stat().st_size for f in p.rglob("*") if f.is_file())
+    return p.stat().st_size if p.exists() else 0
+
+def enforce_budget(max_bytes: int = MAX_BYTES, max_age: timedelta = MAX_AGE, now: datetime | None = None,
+                   raw_dir: Path | None = None) -> int:
+    """Drop whole days, oldest first, while over `max_bytes` or older than `max_age`; returns snapshots dropped."""
+    raw_dir = raw_dir or RAW_DIR
+    now = now or datetime.now(timezone.utc)
+    index = load_index(raw_dir)
+    days: dict[str, list[dict]] = {}
+    for e in index["snapshots"]:
+        days.setdefault(snapshot_time(e["name"]).strftime("%Y-%m-%d"), []).append(e)
+
+    def files(es: list[dict]) -> set[Path]:
+        ad = archive_dir(raw_dir)
+        return {ad / e["archive"] if "archive" in e else raw_dir / e["name"] for e in es} \
+            | {ad / f"{e['archive']}.json" for e in es if "archive" in e}
+
+    total = sum(_size(p) for es in days.values() for p in files(es))
+    dropped: list[dict] = []
+    for day in sorted(days)[:-1]:  # the newest day always stays
+        old = now - datetime.fromisoformat(day).replace(tzinfo=timezone.utc) > max_age + timedelta(days=1)
+        if total <= max_bytes and not old:
+            break
+        for p in files(days[day]):
+            total -= _size(p)
+            _remove(p)
+        dropped += days[day]
+    if dropped:
+        gone = {e["name"] for e in dropped}
+        index["snapshots"] = [e for e in index["snapshots"] if e["name"] not in gone]
+        _save(raw_dir, index)
+    return len(dropped)
+
+def apply(now: datetime | None = None, raw_dir: Path | None = None) -> tuple[int, int]:
+    return archive(now=now, raw_dir=raw_dir), enforce_budget(now=now, raw_dir=raw_dir)
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--archive-after", type=float, default=ARCHIVE_AFTER.days, help="days before a snapshot is compressed")
+    ap.add_argument("--max-gb", type=float, default=MAX_BYTES / 1024**3)
+    ap.add_argument("--max-age-days", type=float, default=MAX_AGE.days)
+    ap.add_argument("--codec", default=CODEC, choices=["gzip", "zstd"])
+    args = ap.parse_args()
+    if args.codec == "zstd" and zstd is None:
+        ap.error("zstandard not installed. pip install zstandard")
+    n = archive(timedelta(days=args.archive_after), codec=args.codec)
+    d = enforce_budget(int(args.max_gb * 1024**3), timedelta(days=args.max_age_days))
+    print(f"Archived {n} snapshot(s), dropped {d}")
@@ -1,13 +1,176 @@
 # run_pipeline.py
-import subprocess
-
-steps = [
-    ["python","ingest.py"],
-    ["python","transform.py"],
-    ["python","quality.py"],
-    ["python","storage.py"],
-    ["python","digest.py"]
-]
-for cmd in steps:
-    print("→", " ".join(cmd))
-    subprocess.check_call(cmd)
\ No newline at end of file
+"""
+In-process pipeline: ingest -> transform -> {quality, storage} -> digest [-> speak].
+
+Stages pass DataFrames in memory and are skipped (make-style) when the fingerprint of
+their inputs — upstream output digests, extra inputs and the source of every local module
+the stage imports — matches
+the last successful run and their outputs still exist. Independent stages run concurrently.
+"""
+from __future__ import annotations
+from pathlib import Path
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable
+import argparse, hashlib, json, time
+
+STATE_FILE = Path("data/state/pipeline.json")
+HERE = Path(__file__).resolve().parent
+
+# every local module a stage imports, directly or through another local module
+# (transform and quality also cover transform.CODE_FILES, added in build_stages)
+SOURCES = {
+    "ingest": ("ingest.py", "canon.py", "itemindex.py", "telemetry.py", "retention.py"),
+    "transform": (),
+    "quality": ("quality.py",),
+    "storage": ("storage.py", "searchindex.py", "query.py"),
+    "digest": ("digest.py", "articles.py", "canon.py", "classify.py", "render.py", "seen.py",
+               "storage.py", "query.py", "searchindex.py"),
+    "speak": ("speak.py", "articles.py", "canon.py"),
+}
+
+@dataclass
+class Stage:
+    name: str
+    run: Callable[[dict], Any]                       # ctx -> result (ctx[dep] = upstream results)
+    deps: tuple[str, ...] = ()
+    source: tuple[str, ...] = ()                     # module files whose edits invalidate the stage
+    inputs: Callable[[dict], list[str]] | None = (lambda ctx: [])  # None = always run (phony)
+    outputs: Callable[[], list[Path]] = (lambda: [])
+    load: Callable[[dict], Any] | None = None        # rebuild the result when skipped
+    digest: Callable[[Any, str], str] = (lambda result, fp: fp)  # output digest seen by dependents
+    timing: dict = field(default_factory=dict)
+
+def sha1(*parts: str) -> str:
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+def file_sha1(p: Path) -> str:
+    return hashlib.sha1(p.read_bytes()).hexdigest() if p.exists() else ""
+
+def source_sha1(files: tuple[str, ...]) -> str:
+    return sha1(*(f"{name}:{file_sha1(HERE / name)}" for name in sorted(files)))
+
+def load_state() -> dict:
+    try:
+        return json.loads(STATE_FILE.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+def save_state(state: dict):
+    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = STATE_FILE.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    tmp.replace(STATE_FILE)
+
+def build_stages(window: str = "today", speak: bool = False, skip_ingest: bool = False) -> list[Stage]:
+    import pandas as pd
+    import render as R
+    import transform as T
+
+    def ingest_run(ctx):
+        import ingest
+        return ingest.main([])
+
+    def transform_inputs(ctx):
+        now = pd.Timestamp.now(tz="UTC")
+        return [T.content_hash(T.latest_raw()), window, now.floor("h").isoformat(), T.code_hash()]
+
+    def quality_run(ctx):
+        from quality import validate
+        validate(ctx["transform"])
+        print("Quality: OK ✅")
+
+    def storage_run(ctx):
+        from storage import store
+        return store(ctx["transform"])
+
+    def digest_run(ctx):
+        from digest import build_digest
+        build_digest(ctx["transform"])
+
+    def speak_run(ctx):
+        import speak
+        speak.main(mode="full")
+
+    stages = [
+        Stage("ingest", ingest_run, source=SOURCES["ingest"], inputs=None,
+              digest=lambda out, fp: T.content_hash(out)),
+        Stage("transform", lambda ctx: T.transform(window), ("ingest",), (*SOURCES["transform"], *T.CODE_FILES),
+              inputs=transform_inputs, load=lambda ctx: T.transform(window)),
+        Stage("quality", quality_run, ("transform",), (*SOURCES["quality"], *T.CODE_FILES)),
+        Stage("storage", storage_run, ("transform",), SOURCES["storage"],
+              outputs=lambda: [Path("data/processed")]),
+        Stage("digest", digest_run, ("transform", "quality"), SOURCES["digest"],
+              inputs=lambda ctx: [pd.Timestamp.now(tz="UTC").strftime("%Y-%m-%d")],
+              outputs=lambda: [Path("docs") / name for name in R.FORMATS]),
+    ]
+    if speak:
+        stages.append(Stage("speak", speak_run, ("digest",), SOURCES["speak"],
+                            outputs=lambda: [Path("docs/playlist.json")]))
+    if skip_ingest:
+        stages[0].run = lambda ctx: T.latest_raw()
+    return stages
+
+def run(stages: list[Stage], force: bool = False, workers: int = 4) -> bool:
+    state, ctx, digests = load_state(), {}, {}
+    pending, running, failed = list(stages), {}, set()
+
+    def fingerprint(s: Stage) -> str | None:
+        if s.inputs is None or force:
+            return None
+        extra = s.inputs(ctx)
+        return sha1(s.name, source_sha1(s.source), *(digests[d] for d in s.deps), *extra)
+
+    def execute(s: Stage) -> tuple[Any, dict]:
+        # runs in a worker thread; only the scheduler loop touches `state`
+        t0 = time.perf_counter()
+        fp = fingerprint(s)
+        prev = state.get(s.name, {})
+        if fp and prev.get("fp") == fp and all(p.exists() for p in s.outputs()):
+            result = s.load(ctx) if s.load else None
+            s.timing = {"status": "skipped", "s": time.perf_counter() - t0}
+            return result, prev
+        result = s.run(ctx)
+        fp = fp or sha1(s.name, str(time.time()))
+        s.timing = {"status": "ran", "s": time.perf_counter() - t0}
+        return result, {"fp": fp, "out": s.digest(result, fp)}
+
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        while pending or running:
+            for s in list(pending):
+                if any(d in failed for d in s.deps):
+                    pending.remove(s)
+                    failed.add(s.name)
+                    s.timing = {"status": "blocked", "s": 0.0}
+                elif all(d in digests for d in s.deps):
+                    pending.remove(s)
+                    running[ex.submit(execute, s)] = s
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                s = running.pop(fut)
+                try:
+                    ctx[s.name], state[s.name] = fut.result()
+                    digests[s.name] = state[s.name]["out"]
+                except (Exception, SystemExit) as e:
+                    failed.add(s.name)
+                    s.timing = {"status": "failed", "s": 0.0}
+                    print(f"[{s.name}] failed: {e!r}")
+            save_state(state)
+
+    print("\nstage       status     seconds")
+    for s in stages:
+        t = s.timing
+        print(f"{s.name:<11} {t.get('status', '-'):<10} {t.get('s', 0.0):7.2f}")
+    return not failed
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--window", default="today", choices=["today","24h"])
+    ap.add_argument("--speak", action="store_true", help="also build audio (speak.py --mode full)")
+    ap.add_argument("--force", action="store_true", help="ignore fingerprints and run every stage")
+    ap.add_argument("--skip-ingest", action="store_true", help="reuse the latest raw snapshot")
+    args = ap.parse_args()
+    ok = run(build_stages(args.window, args.speak, args.skip_ingest), force=args.force)
+    raise SystemExit(0 if ok else 1)
@@ -0,0 +1,145 @@
+# searchindex.py
+"""
+Full-text index over every stored item (SQLite FTS5), kept in step with storage.store().
+
+    python searchindex.py "rust borrow checker" --since 2025-01-01 --domain lwn.net
+    python searchindex.py --rebuild   # backfill from data/processed
+
+Queries hit the FTS5 inverted index and are ranked with bm25 (title weighted over summary
+and domain), so they stay fast as history grows; the date filter uses an index on published.
+"""
+from __future__ import annotations
+from pathlib import Path
+import argparse, sqlite3, time
+import pandas as pd
+
+SEARCH_DB = Path("data/index/search.sqlite")
+WEIGHTS = (10.0, 2.0, 1.0)   # bm25 column weights: title, summary, domain
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+  id INTEGER PRIMARY KEY, link_hash TEXT NOT NULL UNIQUE, link TEXT, title TEXT,
+  summary TEXT, domain TEXT, published INTEGER, stored INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS docs_published ON docs(published);
+CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(
+  title, summary, domain, content='docs', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS docs_ai AFTER INSERT ON docs BEGIN
+  INSERT INTO docs_fts(rowid, title, summary, domain) VALUES (new.id, new.title, new.summary, new.domain);
+END;
+CREATE TRIGGER IF NOT EXISTS docs_ad AFTER DELETE ON docs BEGIN
+  INSERT INTO docs_fts(docs_fts, rowid, title, summary, domain) VALUES ('delete', old.id, old.title, old.summary, old.domain);
+END;
+CREATE TRIGGER IF NOT EXISTS docs_au AFTER UPDATE ON docs BEGIN
+  INSERT INTO docs_fts(docs_fts, rowid, title, summary, domain) VALUES ('delete', old.id, old.title, old.summary, old.domain);
+  INSERT INTO docs_fts(rowid, title, summary, domain) VALUES (new.id, new.title, new.summary, new.domain);
+END;
+"""
+
+def epoch(x) -> int | None:
+    if x is None or pd.isna(x):
+        return None
+    t = pd.Timestamp(x)
+    return int((t.tz_localize("UTC") if t.tz is None else t).timestamp())
+
+def match_expr(text: str) -> str:
+    """Plain words -> FTS5 phrase tokens ANDed together (punctuation like C++ is safe)."""
+    return " ".join('"' + w.replace('"', '""') + '"' for w in text.split())
+
+class SearchIndex:
+    """link_hash-keyed documents; add() upserts, so re-storing an item refreshes its entry."""
+    def __init__(self, path: Path | None = None):
+        path = path or SEARCH_DB
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.db.close()
+
+    def add(self, df: pd.DataFrame, now: int | None = None) -> int:
+        now = int(now if now is not None else time.time())
+        cols = [c for c in ("link", "title", "summary", "domain") if c in df.columns]
+        text = df[cols].astype(object).where(df[cols].notna(), None)
+        published = df["published"] if "published" in df.columns else pd.Series(None, index=df.index)
+        rows = (
+            (h, r.get("link"), r.get("title"), r.get("summary"), r.get("domain"), epoch(p), now)
+            for h, r, p in zip(df["link_hash"], text.to_dict("records"), published)
+        )
+        with self.db:
+            cur = self.db.executemany(
+                "INSERT INTO docs(link_hash, link, title, summary, domain, published, stored)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(link_hash) DO UPDATE SET"
+                " link = excluded.link, title = excluded.title, summary = excluded.summary,"
+                " domain = excluded.domain, published = excluded.published, stored = excluded.stored",
+                rows,
+            )
+        return cur.rowcount
+
+    def search(self, text: str, since=None, until=None, domain: str | None = None,
+               limit: int = 20, raw: bool = False) -> pd.DataFrame:
+        """Best bm25 matches; `raw` passes FTS5 query syntax (OR, NEAR, prefix*) through."""
+        where, args = ["docs_fts MATCH ?"], [text if raw else match_expr(text)]
+        if since is not None:
+            where.append("d.published >= ?"); args.append(epoch(since))
+        if until is not None:
+            where.append("d.published < ?"); args.append(epoch(until))
+        if domain:
+            where.append("d.domain = ?"); args.append(domain)
+        q = (
+            f"SELECT d.published, d.domain, d.title, d.link,"
+            f" snippet(docs_fts, 1, '[', ']', '…', 12) AS snippet, bm25(docs_fts, {', '.join(map(str, WEIGHTS))}) AS rank"
+            f" FROM docs_fts JOIN docs d ON d.id = docs_fts.rowid"
+            f" WHERE {' AND '.join(where)} ORDER BY rank LIMIT ?"
+        )
+        df = pd.read_sql_query(q, self.db, params=[*args, limit])
+        df["published"] = pd.to_datetime(df["published"], unit="s", utc=True)
+        return df
+
+    def optimize(self):
+        """Merge FTS5 b-tree segments (worth it after big backfills)."""
+        with self.db:
+            self.db.execute("INSERT INTO docs_fts(docs_fts) VALUES ('optimize')")
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+def rebuild(path: Path | None = None) -> int:
+    import storage
+    df = storage.read()
+    with SearchIndex(path) as idx:
+        if len(df):
+            idx.add(df)
+        idx.optimize()
+        return len(idx)
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("query", nargs="?", help="words to find (all must match)")
+    ap.add_argument("--since", help="published on/after, e.g. 2025-01-01")
+    ap.add_argument("--until", help="published before")
+    ap.add_argument("--domain")
+    ap.add_argument("--limit", type=int, default=20)
+    ap.add_argument("--raw", action="store_true", help="query is FTS5 syntax (OR, NEAR, prefix*)")
+    ap.add_argument("--rebuild", action="store_true", help="index everything in data/processed")
+    args = ap.parse_args()
+    if args.rebuild:
+        print(f"Indexed {rebuild()} items -> {SEARCH_DB}")
+    if args.query:
+        with SearchIndex() as idx:
+            hits = idx.search(args.query, args.since, args.until, args.domain, args.limit, args.raw)
+        for r in hits.itertuples(index=False):
+            day = r.published.strftime("%Y-%m-%d") if pd.notna(r.published) else "----------"
+            print(f"{day}  {r.domain:<24} {r.title}\n            {r.link}\n            {r.snippet}")
+        if hits.empty:
+            print("No matches.")
+    elif not args.rebuild:
+        ap.error("give a query or --rebuild")
@@ -0,0 +1,101 @@
+# seen.py
+"""
+Links already featured in a digest, so build_digest doesn't repeat them.
+
+docs/.seen_links.tsv is an append-only log of "<epoch seconds>\t<link>" lines. Loading
+keeps the entries younger than MAX_AGE in an insertion-ordered dict (O(1) membership,
+oldest first); add() appends one line per link instead of rewriting the file. Once
+expired or superseded lines outnumber the live ones (and there are at least COMPACT_MIN
+of them) the log is compacted: rewritten to a temp file with only live entries and
+renamed over the original.
+"""
+from __future__ import annotations
+from datetime import timedelta
+from pathlib import Path
+import os, time, uuid
+
+SEEN_FILE = Path("docs/.seen_links.tsv")
+LEGACY_FILE = Path("docs/.seen_links.txt")  # one link per line, no timestamps
+MAX_AGE = timedelta(days=30)
+COMPACT_MIN = 1000  # dead lines tolerated before a rewrite is considered
+
+class SeenLinks:
+    """link -> last time it was featured, oldest first; entries older than max_age are dropped on load."""
+    def __init__(self, path: Path | None = None, max_age: timedelta = MAX_AGE, now: float | None = None):
+        self.path = path or SEEN_FILE
+        self.max_age = max_age
+        self.links: dict[str, float] = {}
+        self._lines = 0  # lines in the file, live or not
+        now = time.time() if now is None else now
+        if not self.path.exists() and self.path == SEEN_FILE and LEGACY_FILE.exists():
+            self._migrate(LEGACY_FILE, now)
+        self._load(now - max_age.total_seconds())
+
+    def __contains__(self, link: str) -> bool:
+        return link in self.links
+
+    def __len__(self) -> int:
+        return len(self.links)
+
+    def _load(self, cutoff: float):
+        if not self.path.exists():
+            return
+        with self.path.open(encoding="utf-8") as f:
+            for line in f:
+                self._lines += 1
+                ts, _, link = line.rstrip("\n").partition("\t")
+                try:
+                    t = float(ts)
+                except ValueError:  # malformed line (e.g. a hand edit)
+                    continue
+                if link and t >= cutoff:
+                    self.links.pop(link, None)  # re-seen: move to the end
+                    self.links[link] = t
+
+    def _migrate(self, legacy: Path, now: float):
+        # the old file has no times: treat its links as seen just now, in file order
+        links = [x.strip() for x in legacy.read_text(encoding="utf-8").splitlines() if x.strip()]
+        self._rewrite({link: now for link in links})
+        legacy.unlink()
+
+    def add(self, links, now: float | None = None) -> int:
+        """Record `links` as featured at `now`: one appended line each, compacting when the log is mostly dead."""
+        now = time.time() if now is None else now
+        links = [link for link in dict.fromkeys(links) if isinstance(link, str) and "\t" not in link and "\n" not in link]
+        if not links:
+            return 0
+        self.expire(now)
+        for link in links:
+            self.links.pop(link, None)
+            self.links[link] = now
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write("".join(f"{now:.0f}\t{link}\n" for link in links))
+        self._lines += len(links)
+        dead = self._lines - len(self.links)
+        if dead >= COMPACT_MIN and dead > len(self.links):
+            self.compact(now)
+        return len(links)
+
+    def expire(self, now: float | None = None) -> int:
+        cutoff = (time.time() if now is None else now) - self.max_age.total_seconds()
+        old = []
+        for link, t in self.links.items():  # oldest first, so stop at the first live one
+            if t >= cutoff:
+                break
+            old.append(link)
+        for link in old:
+            del self.links[link]
+        return len(old)
+
+    def compact(self, now: float | None = None):
+        """Rewrite the log with only live entries (atomic rename)."""
+        self.expire(now)
+        self._rewrite(self.links)
+
+    def _rewrite(self, links: dict[str, float]):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp")
+        tmp.write_text("".join(f"{t:.0f}\t{link}\n" for link, t in links.items()), encoding="utf-8")
+        tmp.replace(self.path)
+        self._lines = len(links)
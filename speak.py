@@ -11,11 +11,7 @@ try:
 except Exception:
     gTTS = None
 
-try:
-    import httpx, trafilatura
-except Exception:
-    httpx = None
-    trafilatura = None
+import articles
 
 DOCS = Path("docs"); DOCS.mkdir(parents=True, exist_ok=True)
 AUDIO_DIR = DOCS / "audio"; AUDIO_DIR.mkdir(parents=True, exist_ok=True)
@@ -172,22 +168,10 @@ def parse_digest(md_text: str, max_items: int = 12):
 
 # ------------- fulltext (optional) -------------
 
-def fetch_fulltext(url: str, timeout=15) -> Optional[str]:
-    """Best-effort full article extraction."""
-    if not httpx or not trafilatura:
-        return None
-    try:
-        with httpx.Client(timeout=timeout, follow_redirects=True) as c:
-            r = c.get(url, headers={"User-Agent": "KernelcutBot/1.0"})
-            r.raise_for_status()
-            txt = trafilatura.extract(r.text, include_comments=False, include_tables=False)
-            if txt:
-                txt = re.sub(r"\s+", " ", txt).strip()
-                if len(txt) > 200:
-                    return txt
-    except Exception:
-        pass
-    return None
+def fulltext(entry: dict | None) -> Optional[str]:
+    """Best-effort full article text from an article cache entry (digest.py already filled the cache)."""
+    txt = (entry or {}).get("text") or ""
+    return txt if len(txt) > 200 else None
 
 # ---------------- synthesis backends ----------------
 
@@ -258,13 +242,16 @@ def main(lang: str = "en", voice: Optional[str] = None, mode: str = "summary", b
     if chosen == "gtts" and not gTTS:
         raise SystemExit("No TTS available. Install gTTS: pip install gTTS")
 
+    # one batch through the shared cache (no network calls for articles the digest just fetched)
+    cached = articles.get_many([it["link"] for it in items]) if mode == "full" else {}
+
     playlist = []
     for idx, it in enumerate(items, 1):
         title, link, domain = it["title"], it["link"], it["domain"]
         summary = it.get("summary", "")
 
         if mode == "full":
-            full = fetch_fulltext(link) or ""
+            full = fulltext(cached.get(link)) or ""
             body = full or summary or title
         else:
             body = summary or title
@@ -294,12 +281,6 @@ def main(lang: str = "en", voice: Optional[str] = None, mode: str = "summary", b
 
     PLAYLIST.write_text(json.dumps(playlist, ensure_ascii=False, indent=2), encoding="utf-8")
 
-    # If your HTML doesn't already include an inline player, you can use an external player.js.
-    if INDEX_HTML.exists():
-        html = INDEX_HTML.read_text(encoding="utf-8")
-        if "player.js" not in html:
-            html = html.replace("</body>", '<script src="player.js"></script>\n</body>')
-            INDEX_HTML.write_text(html, encoding="utf-8")
     print("Playlist ready → docs/playlist.json")
 
 if __name__ == "__main__":
@@ -1,24 +1,154 @@
 # storage.py
+"""
+Processed dataset: data/processed/date=YYYY-MM-DD/*.parquet plus _manifest.json.
+
+Each store() writes immutable part files (one per date partition per run) and appends
+them to the manifest; nothing is rewritten in place. Rows are keyed on link_hash and
+the latest write wins, both in read() and in compact(), which merges a partition's
+parts into one file with tuned row groups. The manifest carries per-file row counts
+and time ranges so readers pick files without listing directories. Stored rows are
+also upserted into the full-text index (searchindex.py) in the same step.
+"""
+from __future__ import annotations
 from pathlib import Path
+from datetime import datetime, timezone
+import argparse, json, uuid
 import pandas as pd
-from transform import transform
+from canon import canonicalize
+from searchindex import SearchIndex
 
 PROC_DIR = Path("data/processed")
 PROC_DIR.mkdir(parents=True, exist_ok=True)
+MANIFEST = PROC_DIR / "_manifest.json"
+KEY = "link_hash"
+ROW_GROUP_ROWS = 50_000    # compacted files: few large row groups
+COMPACT_MIN_PARTS = 2      # partitions with fewer parts are left alone
+
+def _ts(x) -> str | None:
+    return None if pd.isna(x) else pd.Timestamp(x).isoformat()
+
+def file_entry(path: Path, date: str, df: pd.DataFrame) -> dict:
+    pub = df["published"] if "published" in df.columns else pd.Series(dtype="datetime64[ns, UTC]")
+    return {
+        "path": path.relative_to(PROC_DIR).as_posix(),
+        "date": date,
+        "rows": len(df),
+        "published_min": _ts(pub.min()), "published_max": _ts(pub.max()),
+        "fetch_ts_min": _ts(df["fetch_ts"].min()), "fetch_ts_max": _ts(df["fetch_ts"].max()),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+def load_manifest() -> dict:
+    if MANIFEST.exists():
+        return json.loads(MANIFEST.read_text(encoding="utf-8"))
+    return rebuild_manifest() if any(PROC_DIR.glob("date=*/*.parquet")) else {"files": []}
 
-def store():
-    df = transform(window="today")
+def save_manifest(manifest: dict):
+    tmp = MANIFEST.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest, indent=1), encoding="utf-8")
+    tmp.replace(MANIFEST)
+
+def rebuild_manifest() -> dict:
+    """Recover from a missing manifest (or a pre-manifest tree): scan partitions, oldest file first."""
+    files = sorted(PROC_DIR.glob("date=*/*.parquet"), key=lambda p: p.stat().st_mtime)
+    manifest = {"files": [file_entry(p, p.parent.name[len("date="):], read_file(p)) for p in files]}
+    save_manifest(manifest)
+    return manifest
+
+def read_file(path: Path) -> pd.DataFrame:
+    df = pd.read_parquet(path, engine="fastparquet")
+    if KEY not in df.columns and "link" in df.columns:  # pre-manifest date=*/kernelcut.parquet
+        df[KEY] = canonicalize(df["link"])[KEY].to_numpy()
+    return df
+
+def write_part(df: pd.DataFrame, date: str, prefix: str = "part", row_group_rows: int | None = None) -> dict:
+    out_dir = PROC_DIR / f"date={date}"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    out = out_dir / f"{prefix}-{stamp}-{uuid.uuid4().hex[:8]}.parquet"
+    tmp = out.with_suffix(".tmp")
+    # min/max stats on every column (strings too) let query.py skip row groups
+    df.to_parquet(tmp, index=False, engine="fastparquet", row_group_offsets=row_group_rows or len(df) or 1, stats=True)
+    tmp.replace(out)
+    return file_entry(out, date, df)
+
+def upsert(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate in write order; the last row per KEY wins. Rows without a KEY are all kept."""
+    frames = [f for f in frames if len(f)]
+    if not frames:
+        return pd.DataFrame()
+    df = pd.concat(frames, ignore_index=True)
+    if KEY not in df.columns:
+        return df
+    keyed = df[KEY].notna()
+    dup = df[KEY].duplicated(keep="last") & keyed
+    return df[~dup].reset_index(drop=True)
+
+def read(dates: list[str] | None = None) -> pd.DataFrame:
+    """Upserted rows of the given partitions (default: all), files taken from the manifest."""
+    files = [f for f in load_manifest()["files"] if dates is None or f["date"] in dates]
+    return upsert([read_file(PROC_DIR / f["path"]) for f in files])
+
+def partitions() -> list[str]:
+    return sorted({f["date"] for f in load_manifest()["files"]})
+
+def store(df: pd.DataFrame | None = None) -> Path:
+    if df is None:
+        from transform import transform
+        df = transform(window="today")
     if df.empty:
         raise SystemExit("No rows after transform(window='today'). Run ingest.py first?")
 
     # partition by fetch date (UTC) from the data itself
-    run_date = df["fetch_ts"].dt.tz_convert("UTC").dt.date.iloc[0]
-    out_dir = PROC_DIR / f"date={run_date.isoformat()}"
-    out_dir.mkdir(parents=True, exist_ok=True)
+    dates = df["fetch_ts"].dt.tz_convert("UTC").dt.strftime("%Y-%m-%d")
+    manifest = load_manifest()
+    for date, part in df.groupby(dates, sort=True):
+        entry = write_part(part.reset_index(drop=True), date)
+        manifest["files"].append(entry)
+        print(f"Wrote {entry['rows']} rows to {PROC_DIR / entry['path']}")
+    with SearchIndex() as idx:
+        idx.add(df)
+    # parts become visible to readers only once the manifest lists them
+    save_manifest(manifest)
+    return MANIFEST
+
+def compact(min_parts: int = COMPACT_MIN_PARTS, row_group_rows: int = ROW_GROUP_ROWS) -> int:
+    """
+    Merge each partition with >= min_parts files into one upserted file. The new manifest
+    is swapped in before old parts are deleted, so readers never see a partial partition.
+    Returns the number of partitions compacted.
+    """
+    manifest = load_manifest()
+    by_date: dict[str, list[dict]] = {}
+    for f in manifest["files"]:
+        by_date.setdefault(f["date"], []).append(f)
+
+    files, stale = [], []
+    for date, entries in sorted(by_date.items()):
+        if len(entries) < min_parts:
+            files += entries
+            continue
+        df = upsert([read_file(PROC_DIR / f["path"]) for f in entries])
+        if "published" in df.columns:  # tight per-row-group time ranges for range queries
+            df = df.sort_values("published", kind="stable", ignore_index=True)
+        files.append(write_part(df, date, prefix="compact", row_group_rows=row_group_rows))
+        stale += entries
+        print(f"Compacted {len(entries)} files -> {files[-1]['rows']} rows in date={date}")
 
-    out = out_dir / "kernelcut.parquet"
-    df.to_parquet(out, index=False, engine="fastparquet")
-    print(f"Wrote {len(df)} rows to {out}")
+    if stale:
+        save_manifest({"files": files})
+        for f in stale:
+            (PROC_DIR / f["path"]).unlink(missing_ok=True)
+        with SearchIndex() as idx:
+            idx.optimize()
+    return len({f["date"] for f in stale})
 
 if __name__ == "__main__":
-    store()
\ No newline at end of file
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--compact", action="store_true", help="merge small part files per partition instead of storing")
+    ap.add_argument("--min-parts", type=int, default=COMPACT_MIN_PARTS)
+    args = ap.parse_args()
+    if args.compact:
+        compact(args.min_parts)
+    else:
+        store()
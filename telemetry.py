@@ -0,0 +1,125 @@
+# telemetry.py
+"""
+Per-feed fetch metrics from ingest (one NDJSON line per feed per run) and a health report.
+
+    python telemetry.py                     # last 20 runs: failing, slow, stale feeds + hosts
+    python telemetry.py --runs 50 --stale-days 30
+
+Timings come from the httpx `trace` extension: connect_s covers DNS + TCP connect
+(httpcore resolves inside connect_tcp) and is empty when a pooled connection was reused;
+ttfb_s is request sent -> response headers; total_s spans all attempts including backoff.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+import argparse, json, time
+import pandas as pd
+
+METRICS_FILE = Path("data/metrics/fetch.ndjson")
+SLOW_S = 5.0          # p95 total above this => slow
+STALE_DAYS = 14       # no changed, non-empty body for this long => stale
+
+SPANS = {  # field: (start event, end event) as named by httpcore
+    "connect_s": ("connection.connect_tcp.started", "connection.connect_tcp.complete"),
+    "tls_s": ("connection.start_tls.started", "connection.start_tls.complete"),
+    "ttfb_s": ("http11.send_request_headers.started", "http11.receive_response_headers.complete"),
+}
+SPANS_H2 = {"ttfb_s": ("http2.send_request_headers.started", "http2.receive_response_headers.complete")}
+
+@dataclass
+class FeedMetrics:
+    url: str
+    host: str = ""
+    outcome: str = "error"        # ok | not_modified | unchanged | error | breaker_open | backoff
+    status: int | None = None
+    error: str | None = None      # exception class of the last failure
+    attempts: int = 0
+    connect_s: float | None = None
+    tls_s: float | None = None
+    ttfb_s: float | None = None
+    total_s: float = 0.0
+    bytes: int = 0                # on the wire (before decompression)
+    parse_s: float = 0.0
+    entries: int = 0
+    _started: dict = field(default_factory=dict, repr=False)
+
+    async def trace(self, event: str, info: dict):
+        now = time.perf_counter()
+        for name, (start, end) in (*SPANS.items(), *SPANS_H2.items()):
+            if event == start:
+                self._started[name] = now
+            elif event == end and name in self._started:
+                setattr(self, name, (getattr(self, name) or 0.0) + now - self._started.pop(name))
+
+    def record(self) -> dict:
+        d = asdict(self)
+        d.pop("_started")
+        return {k: round(v, 4) if isinstance(v, float) else v for k, v in d.items()}
+
+def write(metrics: list[FeedMetrics], run: str, path: Path | None = None):
+    path = path or METRICS_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as f:
+        f.writelines(json.dumps({"run": run, **m.record()}) + "\n" for m in metrics)
+
+def load(runs: int | None = None, path: Path | None = None) -> pd.DataFrame:
+    path = path or METRICS_FILE
+    if not path.exists():
+        return pd.DataFrame()
+    df = pd.read_json(path, lines=True, dtype={"run": str})
+    if runs:
+        df = df[df["run"].isin(sorted(df["run"].unique())[-runs:])]
+    df["run_ts"] = pd.to_datetime(df["run"], format="%Y%m%dT%H%M%SZ", utc=True)
+    return df
+
+def summarize(df: pd.DataFrame, now: pd.Timestamp | None = None) -> pd.DataFrame:
+    """One row per feed: run count, failure rate, latency percentiles, last success / last new content."""
+    now = now or pd.Timestamp.now(tz="UTC")
+    ok = df["outcome"].isin(["ok", "not_modified", "unchanged"])
+    new = df["outcome"].eq("ok") & df["entries"].gt(0)  # 304s / identical bodies aren't news
+    g = df.assign(ok=ok, ok_ts=df["run_ts"].where(ok), new_ts=df["run_ts"].where(new)).groupby("url")
+    out = pd.DataFrame({
+        "host": g["host"].last(),
+        "runs": g.size(),
+        "fail_rate": 1 - g["ok"].mean(),
+        "last_error": g["error"].last(),
+        "last_status": g["status"].last(),
+        "p50_s": g["total_s"].median(),
+        "p95_s": g["total_s"].quantile(0.95),
+        "retries": g["attempts"].sum() - g.size(),
+        "last_ok": g["ok_ts"].max(),
+        "last_new": g["new_ts"].max(),
+    })
+    out["days_since_new"] = (now - out["last_new"]).dt.total_seconds() / 86400
+    return out
+
+def report(runs: int = 20, slow_s: float = SLOW_S, stale_days: float = STALE_DAYS, path: Path | None = None) -> str:
+    df = load(runs, path)
+    if df.empty:
+        return f"No metrics yet ({path or METRICS_FILE}). Run: python ingest.py"
+    s = summarize(df)
+    pd.set_option("display.width", 160)
+    failing = s[s["fail_rate"] > 0].sort_values(["fail_rate", "runs"], ascending=False)
+    slow = s[s["p95_s"] > slow_s].sort_values("p95_s", ascending=False)
+    # feeds with no new content anywhere in the window count as stale too
+    stale = s[s["days_since_new"].isna() | (s["days_since_new"] > stale_days)].sort_values("days_since_new")
+    hosts = df.groupby("host").agg(feeds=("url", "nunique"), p50_s=("total_s", "median"),
+                                   p95_s=("total_s", lambda x: x.quantile(0.95)),
+                                   connect_s=("connect_s", "median"), ttfb_s=("ttfb_s", "median"),
+                                   mb=("bytes", lambda x: x.sum() / 1e6)).sort_values("p95_s", ascending=False)
+    cols = ["runs", "fail_rate", "last_status", "last_error", "p95_s"]
+    return "\n\n".join([
+        f"{df['run'].nunique()} runs, {len(s)} feeds ({df['run'].min()} .. {df['run'].max()})",
+        f"Failing ({len(failing)}):\n" + (failing[cols].to_string(float_format="%.2f") if len(failing) else "none"),
+        f"Slow, p95 > {slow_s:g}s ({len(slow)}):\n" + (slow[["host", "p50_s", "p95_s", "retries"]].to_string(float_format="%.2f") if len(slow) else "none"),
+        f"Stale, nothing new for > {stale_days:g} days ({len(stale)}):\n" + (stale[["last_ok", "last_new"]].to_string() if len(stale) else "none"),
+        "Hosts by p95:\n" + hosts.head(15).to_string(float_format="%.2f"),
+    ])
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=20, help="look at the last N ingest runs")
+    ap.add_argument("--slow", type=float, default=SLOW_S, help="p95 seconds that counts as slow")
+    ap.add_argument("--stale-days", type=float, default=STALE_DAYS)
+    args = ap.parse_args()
+    print(report(args.runs, args.slow, args.stale_days))
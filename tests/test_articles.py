@@ -0,0 +1,55 @@
+import sys, os, pathlib, asyncio, time
+from types import SimpleNamespace
+import httpx
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+import articles
+
+def use_mock(monkeypatch, tmp_path, handler):
+    mock = lambda **kw: httpx.AsyncClient(transport=httpx.MockTransport(handler), **kw)
+    monkeypatch.setattr(articles, "httpx", SimpleNamespace(AsyncClient=mock, Limits=httpx.Limits))
+    monkeypatch.setattr(articles, "trafilatura", SimpleNamespace(extract=lambda html, **k: html[3:-4]))
+    monkeypatch.setattr(articles, "CACHE_DIR", tmp_path)
+
+def test_fetch_many_concurrent_deduped_with_deadline(tmp_path, monkeypatch):
+    calls = []
+
+    async def handler(request):
+        calls.append(request.url.path)
+        await asyncio.sleep(5 if request.url.path == "/slow" else 0.2)
+        return httpx.Response(200, text=f"<p>Body of {request.url.path}. More text.</p>")
+
+    use_mock(monkeypatch, tmp_path, handler)
+    monkeypatch.setattr(articles, "FETCH_TIMEOUT_S", 1.0)
+    links = [f"https://a.example/{i}" for i in range(6)] + ["https://a.example/0", "https://a.example/slow"]
+    t0 = time.perf_counter()
+    out = articles.get_many(links)
+    assert time.perf_counter() - t0 < 2.0  # ~ the deadline, not the sum of all fetches
+    assert sorted(calls) == sorted(f"/{i}" for i in range(6)) + ["/slow"]
+    assert out["https://a.example/3"]["summary"] == "Body of /3. More text."
+    assert not out["https://a.example/slow"]["ok"]
+
+    calls.clear()  # second consumer (speak.py): everything, failures included, comes from disk
+    again = articles.get_many(["https://a.example/3?utm_source=x", "https://a.example/slow"])
+    assert calls == [] and again["https://a.example/3?utm_source=x"]["text"] == "Body of /3. More text."
+
+def test_stale_entries_revalidate_and_lru_evicts(tmp_path, monkeypatch):
+    seen = []
+
+    def handler(request):
+        seen.append(request.headers.get("if-none-match"))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, text="<p>Article text.</p>", headers={"ETag": '"v1"'})
+
+    use_mock(monkeypatch, tmp_path, handler)
+    url = "https://b.example/x"
+    articles.get_many([url])
+    articles.save(url, dict(articles.load(url), expires=0))  # past its TTL
+    assert articles.get_many([url])[url]["text"] == "Article text."
+    assert seen == [None, '"v1"']
+
+    articles.save("https://b.example/old", {"ok": True, "text": "x" * 500})
+    old = articles.entry_path("https://b.example/old")
+    os.utime(old, (0, 0))
+    assert articles.evict(max_bytes=old.stat().st_size) == 1 and not old.exists()
@@ -0,0 +1,33 @@
+import sys, pathlib
+import pandas as pd
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from classify import classify, category_for
+
+def test_classify_word_boundaries_bans_and_categories():
+    df = pd.DataFrame({
+        "title": ["He said the chairs were comfy", "New LLM tops benchmark", "Celebrity launches AI startup",
+                  "Weekend long read", "Docker adds GPU support", "Open source data tools"],
+        "summary": ["", None, "", "", "", ""],
+        "domain": ["news.example", "blog.example", "gossip.example", "www.wired.com", "notwired.com", "github.com"],
+    }, index=[10, 11, 12, 13, 14, 15])
+    out = classify(df["title"], df["summary"], df["domain"])
+    assert list(out.index) == [10, 11, 12, 13, 14, 15]
+    assert list(out["tech"]) == [False, True, False, True, False, False]
+    assert list(out["ban"]) == [False, False, True, False, False, False]
+    # first KEYWORDS topic wins (dev before hardware); the domain counts for the topic too
+    assert list(out["category"]) == ["default", "ai", "ai", "default", "dev", "data"]
+    assert [category_for(f"{t} {d}") for t, d in zip(df["title"], df["domain"])] == list(out["category"])
+
+def test_classify_empty():
+    empty = pd.Series([], dtype=object)
+    assert classify(empty, empty, empty).empty
+
+def test_classify_stems_and_plurals():
+    titles = pd.Series(["Critical vulnerability in OpenSSH", "New ransomware gang", "Vulnerabilities found",
+                        "Data breaches rise", "Debugging Rust", "Celebrities on holiday", "Travelling light"])
+    blank = pd.Series([""] * len(titles))
+    out = classify(titles, blank, pd.Series(["x.example"] * len(titles)))
+    assert list(out["category"]) == ["security", "security", "security", "security", "dev", "default", "default"]
+    assert list(out["ban"]) == [False, False, False, False, False, True, True]
+    assert [category_for(t) for t in titles] == list(out["category"])
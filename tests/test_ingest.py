@@ -0,0 +1,232 @@
+import sys, pathlib, asyncio
+import httpx
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+import ingest
+
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Test feed</title>
+<item><title>First post</title><link>https://example.com/a?utm_source=x</link>
+<pubDate>Mon, 06 Jan 2025 10:00:00 GMT</pubDate></item>
+<item><title>Second post</title><link>https://example.com/b</link>
+<pubDate>Mon, 06 Jan 2025 09:00:00 GMT</pubDate></item>
+</channel></rss>"""
+
+def run_fetch(handler, url="https://example.com/feed"):
+    async def go():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as c:
+            return await ingest.fetch_once(c, url)
+    return asyncio.run(go())
+
+def test_conditional_get_reuses_cached_items(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest, "CACHE_DIR", tmp_path)
+    seen_headers = []
+
+    def handler(request):
+        seen_headers.append(dict(request.headers))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, content=RSS, headers={"ETag": '"v1"'})
+
+    first = run_fetch(handler)
+    assert [it["link"] for it in first] == ["https://example.com/a", "https://example.com/b"]
+
+    parsed = []
+    monkeypatch.setattr(ingest.feedparser, "parse", lambda *a, **k: parsed.append(1))
+    second = run_fetch(handler)
+    assert second == first
+    assert not parsed
+    assert seen_headers[-1]["if-none-match"] == '"v1"'
+
+def test_identical_body_skips_parse(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest, "CACHE_DIR", tmp_path)
+    handler = lambda request: httpx.Response(200, content=RSS)
+    first = run_fetch(handler)
+
+    monkeypatch.setattr(ingest.feedparser, "parse", lambda *a, **k: 1 / 0)
+    assert run_fetch(handler) == first
+
+def test_retry_after_then_success(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest, "CACHE_DIR", tmp_path)
+    calls = []
+
+    def handler(request):
+        calls.append(1)
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return httpx.Response(200, content=RSS)
+
+    async def go():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as c:
+            return await ingest.fetch_feed(c, "https://example.com/feed")
+    assert len(asyncio.run(go())) == 2
+    assert len(calls) == 2
+
+def test_long_retry_after_closes_host(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest, "CACHE_DIR", tmp_path)
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        return httpx.Response(429, headers={"Retry-After": "3600"})
+
+    async def go():
+        gates, metrics = {}, []
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as c:
+            out = await asyncio.gather(*(ingest.fetch_feed(c, f"https://busy.example/{i}", gates, metrics=metrics)
+                                         for i in range(4)))
+        return out, metrics
+    out, metrics = asyncio.run(go())
+    assert out == [[]] * 4
+    # the first 429 closes the host; feeds queued behind it don't send anything
+    assert len(calls) < 4
+    assert sorted(m.outcome for m in metrics).count("breaker_open") == 4 - len(calls)
+
+def test_circuit_breaker_skips_failing_host(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(ingest, "BREAKER_FAILS", 2)
+    calls = []
+
+    async def no_sleep(_):
+        pass
+
+    def handler(request):
+        calls.append(str(request.url))
+        return httpx.Response(500)
+
+    async def go():
+        monkeypatch.setattr(ingest.asyncio, "sleep", no_sleep)
+        gates = {}
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as c:
+            a = await ingest.fetch_feed(c, "https://down.example/a", gates)
+            b = await ingest.fetch_feed(c, "https://down.example/b", gates)
+        return a, b
+    assert asyncio.run(go()) == ([], [])
+    assert all(u.endswith("/a") for u in calls) and len(calls) == 2
+
+def test_fetch_metrics_and_report(tmp_path, monkeypatch):
+    import telemetry
+    monkeypatch.setattr(ingest, "CACHE_DIR", tmp_path / "cache")
+
+    def handler(request):
+        if request.url.host == "gone.example":
+            return httpx.Response(404)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, content=RSS, headers={"ETag": '"v1"'})
+
+    async def go(metrics):
+        gates = {}
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as c:
+            for u in ("https://example.com/feed", "https://gone.example/feed"):
+                await ingest.fetch_feed(c, u, gates, metrics=metrics)
+
+    log = tmp_path / "fetch.ndjson"
+    for run in ("20250106T100000Z", "20250107T100000Z"):
+        metrics = []
+        asyncio.run(go(metrics))
+        telemetry.write(metrics, run, log)
+    ok, gone = metrics
+    assert (ok.outcome, ok.status, ok.entries, ok.attempts) == ("not_modified", 304, 2, 1)
+    assert (gone.outcome, gone.status, gone.error) == ("error", 404, "HTTPStatusError")
+
+    s = telemetry.summarize(telemetry.load(path=log), now=telemetry.pd.Timestamp("2025-01-08T00:00Z"))
+    assert s.loc["https://gone.example/feed", "fail_rate"] == 1.0
+    assert s.loc["https://example.com/feed", "last_new"] == telemetry.pd.Timestamp("2025-01-06T10:00Z")
+    assert "gone.example" in telemetry.report(path=log)
+
+def test_run_stream_writes_ndjson(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest, "CACHE_DIR", tmp_path / "cache")
+    feeds = tmp_path / "feeds.txt"
+    feeds.write_text("https://one.example/feed\nhttps://two.example/feed\n")
+    monkeypatch.setattr(ingest, "FEEDS_FILE", feeds)
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=RSS))
+    monkeypatch.setattr(ingest, "make_client", lambda: httpx.AsyncClient(transport=transport))
+
+    out = tmp_path / "kernelcut_20250106T120000Z.ndjson"
+    assert asyncio.run(ingest.run_stream(out)) == 2  # same links in both feeds
+    assert not out.with_name(out.name + ".part").exists()
+
+    import transform
+    rows = transform.read_raw(out)
+    assert [r["title"] for r in rows] == ["First post", "Second post"]
+
+def test_pooled_parse_matches_inline():
+    inline = asyncio.run(ingest.parse_items("u", RSS))
+    async def pooled():
+        with ingest.make_pool("thread") as pool:
+            return await ingest.parse_items("u", RSS, pool)
+    assert asyncio.run(pooled()) == inline
+
+def test_item_index_marks_new_across_runs(tmp_path):
+    from itemindex import ItemIndex
+    items = lambda: [{"link": "https://example.com/a"}, {"link": "https://example.com/b"}]
+    with ItemIndex(tmp_path / "items.sqlite") as index:
+        assert all(it["is_new"] for it in ingest.mark_new(items(), index))
+        index.commit(now=1_000)
+    with ItemIndex(tmp_path / "items.sqlite") as index:
+        assert ingest.mark_new(items(), index, new_only=True) == []
+        index.commit(now=2_000)
+        assert index.evict(days=1, now=2_000 + 86_400 + 1) == 2
+        assert len(index) == 0
+
+def test_incremental_high_water_mark(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest, "CACHE_DIR", tmp_path)
+    body = {"rss": RSS}
+    handler = lambda request: httpx.Response(200, content=body["rss"])
+
+    async def go(pending):
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as c:
+            return await ingest.fetch_once(c, "https://example.com/feed", pending=pending)
+
+    pending = {}
+    assert len(asyncio.run(go(pending))) == 2
+    assert asyncio.run(go({})) != []  # mark not committed yet: nothing is lost
+    ingest.commit_cache(pending)
+
+    body["rss"] = RSS.replace(b"<channel><title>Test feed</title>", b"""<channel><title>Test feed</title>
+<item><title>Third post</title><link>https://example.com/c</link>
+<pubDate>Mon, 06 Jan 2025 11:00:00 GMT</pubDate></item>""")
+    pending = {}
+    assert [it["title"] for it in asyncio.run(go(pending))] == ["Third post"]
+    ingest.commit_cache(pending)
+    assert asyncio.run(go({})) == []
+
+def test_incremental_drops_known_undated_entries(tmp_path, monkeypatch):
+    from itemindex import ItemIndex
+    monkeypatch.setattr(ingest, "CACHE_DIR", tmp_path / "cache")
+    undated = b"<item><title>Undated</title><link>https://example.com/u</link></item>"
+    body = {"rss": RSS.replace(b"</channel>", undated + b"</channel>")}
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=body["rss"]))
+    monkeypatch.setattr(ingest, "make_client", lambda: httpx.AsyncClient(transport=transport))
+
+    def run():
+        pending = {}
+        with ItemIndex(tmp_path / "items.sqlite") as index:
+            items = asyncio.run(ingest.run(["https://example.com/feed"], index=index, pending=pending))
+            index.commit()
+        ingest.commit_cache(pending)
+        return sorted(it["title"] for it in items)
+
+    assert run() == ["First post", "Second post", "Undated"]
+    body["rss"] += b" "  # new body, same entries: parsed again, nothing above the mark
+    assert run() == []
+    body["rss"] = body["rss"].replace(undated, undated + undated.replace(b"/u<", b"/v<").replace(b"Undated", b"Other"))
+    assert run() == ["Other"]
+
+def test_sharded_snapshot_dedupes_across_shards(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # workers open data/index relative to cwd
+    monkeypatch.setattr(ingest, "CACHE_DIR", tmp_path / "cache")
+    feeds = tmp_path / "feeds.txt"
+    feeds.write_text("\n".join(f"https://host{i}.example/feed" for i in range(6)))
+    monkeypatch.setattr(ingest, "FEEDS_FILE", feeds)
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=RSS))
+    monkeypatch.setattr(ingest, "make_client", lambda: httpx.AsyncClient(transport=transport))
+
+    out = tmp_path / "kernelcut_20250106T120000Z.shards"
+    n, _, hashes = ingest.run_sharded(out, 3)
+    assert n == 2 and len(hashes) == 2
+    assert (out / "_manifest.json").exists() and not out.with_name(out.name + ".tmp").exists()
+
+    import transform
+    assert sorted(r["title"] for r in transform.read_raw(out)) == ["First post", "Second post"]
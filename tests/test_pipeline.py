@@ -9,6 +9,15 @@ def ensure_raw():
     if not list(raw.glob("kernelcut_*.json")):
         subprocess.check_call([sys.executable, "ingest.py"])
 
+@pytest.fixture(autouse=True)
+def scratch_dirs(tmp_path, monkeypatch):
+    # keep transform's result cache and rolling state out of the repo's data/
+    import transform
+    monkeypatch.setattr(transform, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(transform, "STATE_DIR", tmp_path / "state")
+    monkeypatch.setattr(transform, "STATE_ROWS", tmp_path / "state" / "rolling.parquet")
+    monkeypatch.setattr(transform, "STATE_CONSUMED", tmp_path / "state" / "consumed.json")
+
 def test_transform_and_quality():
     from transform import transform
     from quality import validate
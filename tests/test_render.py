@@ -0,0 +1,34 @@
+import sys, pathlib, json
+from datetime import date
+from xml.etree import ElementTree
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+import render
+from render import Digest, Item
+from speak import parse_digest
+
+def sample() -> Digest:
+    return Digest(date(2025, 8, 31), (
+        Item("Rust & C++ <interop>", "https://a.example/1?x=1&y=2", "a.example", "First one.", "dev", "💻"),
+        Item("New GPUs", "https://b.example/2", "b.example", "", "hardware", "🖥️"),
+    ))
+
+def test_render_all_formats_once_and_skip_unchanged(tmp_path):
+    d = sample()
+    assert render.render(d, tmp_path) == {name: True for name in render.FORMATS}
+    mtimes = {p.name: p.stat().st_mtime_ns for p in tmp_path.iterdir()}
+    assert render.render(d, tmp_path) == {name: False for name in render.FORMATS}
+    assert {p.name: p.stat().st_mtime_ns for p in tmp_path.iterdir()} == mtimes  # untouched, no temp files left
+
+    items = parse_digest((tmp_path / "digest.md").read_text(encoding="utf-8"))
+    assert [(it["title"], it["link"], it["domain"]) for it in items] == [(i.title, i.link, i.domain) for i in d.items]
+    html = (tmp_path / "index.html").read_text(encoding="utf-8")
+    assert "Rust &amp; C++ &lt;interop&gt;" in html and 'href="https://a.example/1?x=1&amp;y=2"' in html
+    assert html.count('<script src="player.js"></script>') == 1  # in the template, not patched in by speak
+    feed = json.loads((tmp_path / "feed.json").read_text(encoding="utf-8"))
+    assert [it["url"] for it in feed["items"]] == [i.link for i in d.items]
+    rss = ElementTree.parse(tmp_path / "feed.xml").getroot()
+    assert [e.text for e in rss.iter("title")][1:] == [i.title for i in d.items]
+
+    changed = Digest(d.day, d.items[:1])
+    assert render.render(changed, tmp_path) == {name: True for name in render.FORMATS}
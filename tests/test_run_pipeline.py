@@ -0,0 +1,46 @@
+import sys, pathlib, ast
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+import run_pipeline as rp
+from run_pipeline import Stage
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+
+def local_imports(name: str, seen: set | None = None) -> set[str]:
+    """Local modules `name` imports, transitively (including imports inside functions)."""
+    seen = set() if seen is None else seen
+    for node in ast.walk(ast.parse((ROOT / name).read_text(encoding="utf-8"))):
+        mods = [a.name for a in node.names] if isinstance(node, ast.Import) else \
+            [node.module] if isinstance(node, ast.ImportFrom) and node.module else []
+        for m in mods:
+            f = f"{m.split('.')[0]}.py"
+            if (ROOT / f).exists() and f not in seen:
+                seen.add(f)
+                local_imports(f, seen)
+    return seen
+
+def test_editing_an_imported_module_invalidates_the_stage(tmp_path, monkeypatch):
+    monkeypatch.setattr(rp, "HERE", tmp_path)
+    monkeypatch.setattr(rp, "STATE_FILE", tmp_path / "state.json")
+    (tmp_path / "main.py").write_text("import helper\n")
+    (tmp_path / "helper.py").write_text("X = 1\n")
+    runs = []
+    stages = lambda: [Stage("s", lambda ctx: runs.append(1), source=("main.py", "helper.py"))]
+
+    rp.run(stages())
+    rp.run(stages())
+    assert len(runs) == 1
+    (tmp_path / "helper.py").write_text("X = 2\n")
+    rp.run(stages())
+    assert len(runs) == 2
+
+def test_stage_sources_cover_their_imports():
+    import transform
+    # storage.store() only imports transform when called without a frame (its CLI path)
+    cli_only = {"transform.py", *transform.CODE_FILES}
+    for s in rp.build_stages(speak=True):
+        entry = f"{s.name}.py"
+        needed = local_imports(entry) | {entry}
+        if s.name in ("storage", "digest"):
+            needed -= cli_only
+        assert needed <= set(s.source), (s.name, needed - set(s.source))
@@ -0,0 +1,34 @@
+import sys, pathlib
+from datetime import timedelta
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+import seen
+from seen import SeenLinks
+
+DAY = 86400
+
+def test_append_only_age_window_and_compaction(tmp_path, monkeypatch):
+    path = tmp_path / "seen.tsv"
+    s = SeenLinks(path, max_age=timedelta(days=2), now=0)
+    assert s.add(["https://a/1", "https://a/2", "https://a/1", None], now=0) == 2
+    s.add(["https://a/3"], now=DAY)
+    s.add(["https://a/1"], now=DAY)  # re-seen moves to the end
+    assert path.read_text().count("\n") == 4  # appended, not rewritten
+
+    s = SeenLinks(path, max_age=timedelta(days=2), now=2.5 * DAY)
+    assert list(s.links) == ["https://a/3", "https://a/1"] and "https://a/2" not in s
+
+    monkeypatch.setattr(seen, "COMPACT_MIN", 3)
+    s.add(["https://a/5"], now=3 * DAY)  # 5 lines, 2 dead
+    assert path.read_text().count("\n") == 5
+    s.add(["https://a/4"], now=4 * DAY)
+    # a/1 and a/3 expired too: 5 dead lines vs 2 live ones, so the log is rewritten
+    assert path.read_text() == f"{3 * DAY}\thttps://a/5\n{4 * DAY}\thttps://a/4\n"
+    assert list(SeenLinks(path, max_age=timedelta(days=2), now=4 * DAY).links) == ["https://a/5", "https://a/4"]
+
+def test_migrates_legacy_list(tmp_path, monkeypatch):
+    monkeypatch.setattr(seen, "SEEN_FILE", tmp_path / "seen.tsv")
+    monkeypatch.setattr(seen, "LEGACY_FILE", tmp_path / "seen.txt")
+    seen.LEGACY_FILE.write_text("https://a/1\nhttps://a/2\n\n")
+    s = SeenLinks(now=100)
+    assert list(s.links) == ["https://a/1", "https://a/2"] and not seen.LEGACY_FILE.exists()
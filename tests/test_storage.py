@@ -0,0 +1,96 @@
+import sys, pathlib
+import pandas as pd
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+import storage, searchindex
+
+def rows(links, title, fetch="2025-01-06T10:00:00Z"):
+    return pd.DataFrame({
+        "title": [f"{title} {l}" for l in links],
+        "link_hash": links,
+        "published": pd.to_datetime(["2025-01-06T09:00:00Z"] * len(links), utc=True),
+        "fetch_ts": pd.to_datetime([fetch] * len(links), utc=True),
+    })
+
+def use_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "PROC_DIR", tmp_path)
+    monkeypatch.setattr(storage, "MANIFEST", tmp_path / "_manifest.json")
+    monkeypatch.setattr(searchindex, "SEARCH_DB", tmp_path / "search.sqlite")
+
+def test_store_appends_parts_and_upserts_on_link(tmp_path, monkeypatch):
+    use_dir(tmp_path, monkeypatch)
+    storage.store(rows(["a", "b"], "first"))
+    storage.store(rows(["b", "c"], "second"))
+    assert len(list(tmp_path.glob("date=2025-01-06/part-*.parquet"))) == 2
+
+    df = storage.read().set_index("link_hash")
+    assert sorted(df.index) == ["a", "b", "c"]
+    assert df.loc["b", "title"] == "second b"  # later run wins
+
+    assert storage.compact() == 1
+    files = storage.load_manifest()["files"]
+    assert len(files) == 1 and files[0]["rows"] == 3
+    assert [p.name for p in tmp_path.glob("date=*/*.parquet")] == [pathlib.Path(files[0]["path"]).name]
+    after = storage.read().set_index("link_hash")
+    assert sorted(after.index) == ["a", "b", "c"] and after.loc["b", "title"] == "second b"
+
+def test_store_splits_partitions_and_manifest_rebuilds(tmp_path, monkeypatch):
+    use_dir(tmp_path, monkeypatch)
+    storage.store(pd.concat([rows(["a"], "x"), rows(["b"], "y", fetch="2025-01-07T01:00:00Z")]))
+    assert storage.partitions() == ["2025-01-06", "2025-01-07"]
+    (tmp_path / "_manifest.json").unlink()
+    assert list(storage.read(["2025-01-07"])["link_hash"]) == ["b"]
+
+def test_query_prunes_partitions_row_groups_and_columns(tmp_path, monkeypatch):
+    import query
+    use_dir(tmp_path, monkeypatch)
+    day1 = rows(["a", "b"], "old").assign(domain=["x.io", "y.io"], score=[0.9, 0.2])
+    day2 = rows([f"n{i}" for i in range(6)], "new", fetch="2025-01-07T10:00:00Z").assign(
+        domain=["x.io", "y.io"] * 3, score=[0.1, 0.2, 0.6, 0.7, 0.8, 0.9])
+    storage.store(day1)
+    storage.store(day2.iloc[:3])
+    storage.store(day2.iloc[3:])
+    storage.compact(row_group_rows=2)
+
+    assert [f["date"] for f in query.files(start="2025-01-07")] == ["2025-01-07"]
+    assert query.files(filters=[("fetch_ts", "<", "2025-01-07")])[0]["date"] == "2025-01-06"
+    batches = list(query.scan(start="2025-01-07", columns=["link_hash"], filters=[("score", ">", 0.5)]))
+    assert all(list(b.columns) == ["link_hash"] for b in batches)
+    assert len(batches) == 2  # row group [0.1, 0.2] skipped on stats
+
+    out = query.query(columns=["title", "score"], filters=[("domain", "in", ["x.io"]), ("score", ">", 0.5)])
+    assert list(out.columns) == ["title", "score"]
+    assert sorted(out["title"]) == ["new n2", "new n4", "old a"]
+
+def test_store_updates_full_text_index(tmp_path, monkeypatch):
+    use_dir(tmp_path, monkeypatch)
+    storage.store(rows(["a", "b"], "Rust borrow checker").assign(summary=["", "compiler news"], domain="x.io"))
+    storage.store(rows(["b"], "Kernel scheduler", fetch="2025-01-07T10:00:00Z").assign(summary=None, domain="y.io"))
+    with searchindex.SearchIndex() as idx:
+        assert len(idx) == 2
+        assert list(idx.search("borrow")["title"]) == ["Rust borrow checker a"]  # "b" was re-stored
+        assert list(idx.search("scheduler", domain="y.io")["title"]) == ["Kernel scheduler b"]
+        assert idx.search("rust", since="2025-01-07").empty
+        assert len(idx.search("C++ borrow")) == 0 and len(idx.search("rust OR kernel", raw=True)) == 2
+
+def test_legacy_tree_keeps_rows_through_upsert_and_compact(tmp_path, monkeypatch):
+    use_dir(tmp_path, monkeypatch)
+    # pre-manifest layout: one kernelcut.parquet per date, no link_hash column
+    legacy = rows([f"https://x.io/{i}" for i in range(5)], "old").drop(columns="link_hash")
+    legacy["link"] = [f"https://x.io/{i}" for i in range(5)]
+    (tmp_path / "date=2025-01-06").mkdir()
+    legacy.to_parquet(tmp_path / "date=2025-01-06" / "kernelcut.parquet", index=False, engine="fastparquet")
+
+    from canon import canonicalize
+    new = rows(["https://x.io/4"], "new")
+    new["link"] = ["https://x.io/4"]
+    new["link_hash"] = canonicalize(new["link"])["link_hash"].to_numpy()
+    storage.store(new)
+
+    df = storage.read()
+    assert len(df) == 5
+    assert df.set_index("link")["title"]["https://x.io/4"] == "new https://x.io/4"
+    assert storage.compact() == 1
+    after = storage.read()
+    assert sorted(after["link"]) == sorted(legacy["link"]) and after["link_hash"].notna().all()
+    assert storage.upsert([legacy, legacy]).shape[0] == 10  # no key: nothing merged
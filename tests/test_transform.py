@@ -0,0 +1,148 @@
+import sys, pathlib, json
+import pandas as pd
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from canon import canonical_url, canonicalize
+import transform
+
+def test_canonical_url_rules():
+    u = "HTTPS://Example.COM/a?utm_source=x&id=3&ref_src=tw&fbclid=1#frag"
+    assert canonical_url(u) == "https://example.com/a?id=3"
+    assert canonical_url("") == ""
+
+def test_canonicalize_column_matches_scalar():
+    links = pd.Series(["https://a.com/x?utm_medium=1", None, "https://a.com/x?utm_medium=1", "https://b.org/"], index=[5, 6, 7, 8])
+    out = canonicalize(links)
+    assert list(out.index) == [5, 6, 7, 8]
+    assert list(out["link_norm"]) == ["https://a.com/x", "", "https://a.com/x", "https://b.org/"]
+    assert list(out["domain"]) == ["a.com", "", "a.com", "b.org"]
+    assert out["link_hash"].iloc[0] == out["link_hash"].iloc[2]
+
+def test_load_df_ndjson(tmp_path):
+    p = tmp_path / "kernelcut_20250106T120000Z.ndjson"
+    rows = [{"source": "S", "title": "Show HN: Thing", "link": "https://x.io/p?utm_source=a",
+             "summary": "", "published": "2025-01-06T10:00:00+00:00"}]
+    p.write_text("\n".join(json.dumps(r) for r in rows))
+    df = transform.load_df(p)
+    assert df.loc[0, "title"] == "Thing"
+    assert df.loc[0, "link_norm"] == "https://x.io/p" and df.loc[0, "domain"] == "x.io"
+
+def write_snapshot(d, ts, rows):
+    (d / f"kernelcut_{ts}.json").write_text(json.dumps(rows))
+
+def item(n, published="2025-01-06T10:00:00+00:00"):
+    return {"source": "S", "title": f"Story number {n}", "link": f"https://x.io/{n}", "summary": "", "published": published}
+
+def test_incremental_state_keeps_items_that_left_the_feed(tmp_path, monkeypatch):
+    monkeypatch.setattr(transform, "RAW_DIR", tmp_path)
+    monkeypatch.setattr(transform, "STATE_DIR", tmp_path / "state")
+    monkeypatch.setattr(transform, "STATE_ROWS", tmp_path / "state" / "rolling.parquet")
+    monkeypatch.setattr(transform, "STATE_CONSUMED", tmp_path / "state" / "consumed.json")
+    now = pd.Timestamp("2025-01-06T12:00:00Z")
+
+    write_snapshot(tmp_path, "20250106T100000Z", [item(1), item(2)])
+    assert len(transform.update_state(now)) == 2
+    write_snapshot(tmp_path, "20250106T110000Z", [item(2), item(3)])
+    state = transform.update_state(now)
+    assert sorted(state["link_norm"]) == ["https://x.io/1", "https://x.io/2", "https://x.io/3"]
+    assert json.loads((tmp_path / "state" / "consumed.json").read_text()) == [
+        "kernelcut_20250106T100000Z.json", "kernelcut_20250106T110000Z.json"]
+
+    monkeypatch.setattr(transform, "load_df", lambda p: 1 / 0)  # nothing new: no parsing
+    later = pd.Timestamp("2025-01-10T12:00:00Z")
+    assert len(transform.update_state(later)) == 0  # everything aged out of the window
+
+def test_near_duplicates_keep_best_scored():
+    from neardup import collapse
+    df = pd.DataFrame({
+        "title": ["Nvidia unveils new GPU for AI training at conference",
+                  "Nvidia unveils new GPU for AI training at its conference",
+                  "Rust 2.0 released with a new borrow checker"],
+        "summary": ["The company said the chip doubles performance."] * 2 + [""],
+        "score": [0.4, 0.9, 0.5],
+        "link_hash": ["a", "b", "c"],
+    })
+    out = collapse(df).set_index("link_hash")
+    assert sorted(out.index) == ["b", "c"]
+    assert out.loc["b", "dup_count"] == 2 and out.loc["c", "dup_count"] == 1
+    assert out.loc["b", "dup_cluster"] == "b"
+
+def test_transform_result_is_memoized(tmp_path, monkeypatch):
+    monkeypatch.setattr(transform, "RAW_DIR", tmp_path)
+    monkeypatch.setattr(transform, "CACHE_DIR", tmp_path / "cache")
+    write_snapshot(tmp_path, "20250106T100000Z", [item(1), item(2)])
+    first = transform.transform()
+
+    load_df = transform.load_df
+    monkeypatch.setattr(transform, "load_df", lambda p: 1 / 0)
+    pd.testing.assert_frame_equal(transform.transform(), first)
+
+    monkeypatch.setattr(transform, "load_df", load_df)
+    write_snapshot(tmp_path, "20250106T100000Z", [item(1), item(2), item(3)])  # new content => new key
+    assert len(transform.transform()) == 3
+
+    # ranking weights are part of the key: a different half-life is recomputed, not served stale
+    slow = transform.transform(weights={"half_life_h": 1e6})
+    assert (slow["score"] > transform.transform()["score"].max()).any()
+
+def test_arrow_snapshot_roundtrip(tmp_path):
+    import pytest
+    pytest.importorskip("pyarrow")
+    import ingest
+    p = tmp_path / "kernelcut_20250106T100000Z.arrow"
+    ingest.write_arrow([item(1), dict(item(2), is_new=True)], p)
+    df = transform.load_df(p)
+    assert list(df["link_norm"]) == ["https://x.io/1", "https://x.io/2"]
+    assert df["published"].notna().all()
+
+def test_converted_snapshot_is_listed_once_as_arrow(tmp_path, monkeypatch):
+    monkeypatch.setattr(transform, "RAW_DIR", tmp_path)
+    write_snapshot(tmp_path, "20250105T100000Z", [item(1)])
+    write_snapshot(tmp_path, "20250106T100000Z", [item(2)])
+    (tmp_path / "kernelcut_20250106T100000Z.arrow").write_bytes(b"")  # convert_raw.py without --delete
+    assert [p.name for p in transform.raw_snapshots()] == [
+        "kernelcut_20250105T100000Z.json", "kernelcut_20250106T100000Z.arrow"]
+    assert transform.latest_raw().suffix == ".arrow"
+
+def test_rank_keys_are_run_independent_and_topk_merges():
+    from rank import Ranker, TopK
+    df = pd.DataFrame({
+        "title": ["Short", "A much longer and more descriptive headline", "Show HN: my thing"],
+        "domain": ["x.io", "arstechnica.com", "x.io"],
+        "published": pd.to_datetime(["2025-01-06T10:00Z", "2025-01-06T04:00Z", "2025-01-06T11:00Z"], utc=True),
+    })
+    a = Ranker(as_of=pd.Timestamp("2025-01-06T12:00Z")).annotate(df)
+    b = Ranker(as_of=pd.Timestamp("2025-01-08T12:00Z")).annotate(df)
+    pd.testing.assert_series_equal(a["rank_key"], b["rank_key"])
+    assert (b["score"] < a["score"]).all() and a["score"].between(0, 1).all()
+
+    top = TopK(2).push(a.iloc[:1]).push(a.iloc[1:]).result()
+    assert list(top["title"]) == list(a.nlargest(2, "rank_key")["title"])
+
+def test_archived_snapshots_read_transparently(tmp_path, monkeypatch):
+    import retention
+    from datetime import datetime, timedelta, timezone
+    monkeypatch.setattr(transform, "RAW_DIR", tmp_path)
+    write_snapshot(tmp_path, "20250104T100000Z", [item(1)])
+    (tmp_path / "kernelcut_20250105T100000Z.ndjson").write_text(json.dumps(item(2)) + "\n")
+    shards = tmp_path / "kernelcut_20250105T110000Z.shards"
+    shards.mkdir()
+    (shards / "part-000.ndjson").write_text(json.dumps(item(3)) + "\n")
+    (shards / "_manifest.json").write_text(json.dumps({"parts": ["part-000.ndjson"], "items": 1}))
+    write_snapshot(tmp_path, "20250106T100000Z", [item(4)])
+    before = {p.name: (transform.load_df(p), transform.content_hash(p)) for p in transform.raw_snapshots()}
+
+    now = datetime(2025, 1, 6, 12, tzinfo=timezone.utc)
+    assert retention.archive(timedelta(hours=12), now=now, raw_dir=tmp_path) == 3
+    assert sorted(p.name for p in tmp_path.glob("kernelcut_*")) == ["kernelcut_20250106T100000Z.json"]
+    assert sorted(p.name for p in (tmp_path / "archive").glob("*.gz")) == ["2025-01-04.gz", "2025-01-05.gz"]
+    assert [p.name for p in transform.raw_snapshots()] == list(before)
+    for p in transform.raw_snapshots():
+        pd.testing.assert_frame_equal(transform.load_df(p), before[p.name][0])
+        assert transform.content_hash(p) == before[p.name][1]
+
+    write_snapshot(tmp_path, "20250107T100000Z", [item(5)])  # not registered: found via the dir mtime
+    assert transform.latest_raw().name == "kernelcut_20250107T100000Z.json"
+    assert retention.enforce_budget(max_bytes=1 << 30, max_age=timedelta(days=1), now=now, raw_dir=tmp_path) == 1
+    assert transform.raw_snapshots()[0].name == "kernelcut_20250105T100000Z.ndjson"
+    assert not (tmp_path / "archive" / "2025-01-04.gz").exists()
@@ -1,41 +1,83 @@
 # transform.py
 from pathlib import Path
-import json, re
+import argparse, hashlib, json, re
 import pandas as pd
-from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+from canon import canonicalize
+from neardup import collapse
+from rank import Ranker, TopK, WEIGHTS
+import retention
+
+# Optional: memory-mapped Arrow snapshots (ingest.py --format arrow)
+try:
+    import pyarrow as pa, pyarrow.ipc  # pip install pyarrow
+except Exception:
+    pa = None
 
 RAW_DIR = Path("data/raw")
+STATE_DIR = Path("data/state")
+STATE_ROWS = STATE_DIR / "rolling.parquet"    # recent normalized rows across snapshots
+STATE_CONSUMED = STATE_DIR / "consumed.json"  # raw snapshot names already merged in
+ROLLING_WINDOW = pd.Timedelta(days=3)
+CACHE_DIR = Path("data/cache/transform")
+CACHE_KEEP = 8             # most recent cached results kept on disk
+TRANSFORM_VERSION = "2"    # bump when output changes without a code change here (e.g. new deps)
+CODE_FILES = ("transform.py", "canon.py", "neardup.py", "rank.py", "retention.py")
+STATE_COLS = ["title","summary","link","source","published","title_norm","link_norm","domain","link_hash","fetch_ts"]
 
-GOOD_DOMAINS = {
-    "www.theverge.com","arstechnica.com","techcrunch.com","www.wired.com",
-    "www.nature.com","arxiv.org","spectrum.ieee.org","ai.googleblog.com",
-    "openai.com","deepmind.google","www.semanticscholar.org"
-}
-BLOCK_TITLE = re.compile(r"(?i)^(show\s*hn|ask\s*hn|who\s*is\s*hiring|launch\s*hn)\b")
 CLEAN_TITLE = re.compile(r"(?i)^(show\s*hn|ask\s*hn|launch\s*hn)\s*[:\-]\s*")
 
+# .ndjson = `ingest.py --stream`, .shards = directory written by `ingest.py --shards N`,
+# .arrow = `ingest.py --format arrow` / convert_raw.py
+RAW_SUFFIXES = (".json", ".ndjson", ".shards", ".arrow")
+
+def raw_snapshots() -> list[Path]:
+    # live or archived (retention.py); archived paths no longer exist on disk but read_* below resolve them.
+    # One snapshot per stem: convert_raw.py leaves an .arrow twin next to the JSON, and the .arrow wins.
+    by_stem: dict[str, str] = {}
+    for n in retention.snapshots(RAW_DIR):
+        if Path(n).suffix not in RAW_SUFFIXES:
+            continue
+        stem = n.split(".", 1)[0]
+        if stem not in by_stem or n.endswith(".arrow"):
+            by_stem[stem] = n
+    return [RAW_DIR / by_stem[s] for s in sorted(by_stem)]
+
 def latest_raw() -> Path:
-    files = sorted(RAW_DIR.glob("kernelcut_*.json"))
+    files = raw_snapshots()
     if not files:
         raise SystemExit("No raw files. Run: python ingest.py")
     return files[-1]
 
-def normalize_link(u: str) -> str:
-    try:
-        p = urlparse(u)
-        # drop tracking query params
-        q = [(k,v) for k,v in parse_qsl(p.query, keep_blank_values=True)
-             if not re.match(r"^(utm_|ref$|ref_src$|ncid$|fbclid$)", k, re.I)]
-        p = p._replace(query=urlencode(q, doseq=True))
-        # drop fragments
-        p = p._replace(fragment="")
-        return urlunparse(p)
-    except Exception:
-        return u or ""
+def snapshot_ts(path: Path) -> pd.Timestamp:
+    return pd.to_datetime(path.stem.replace("kernelcut_", ""), format="%Y%m%dT%H%M%SZ", utc=True)
+
+def parse_raw(text: str, suffix: str) -> list[dict]:
+    if suffix == ".ndjson":
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    return json.loads(text)
+
+def read_raw(path: Path) -> list[dict]:
+    if not path.exists():
+        data, suffix = retention.read_archived(path)
+        return parse_raw(data.decode("utf-8"), suffix)
+    if path.is_dir():
+        return [it for part in retention.source_files(path) for it in read_raw(part)]
+    return parse_raw(path.read_text(encoding="utf-8"), path.suffix)
+
+def read_arrow(path: Path) -> pd.DataFrame:
+    if pa is None:
+        raise SystemExit("pyarrow not installed. pip install pyarrow")
+    if path.exists():
+        # memory-mapped: string buffers stay in the page cache, columns come back Arrow-backed
+        with pa.memory_map(str(path), "r") as src:
+            table = pa.ipc.open_file(src).read_all()
+    else:
+        table = pa.ipc.open_file(pa.BufferReader(retention.read_archived(path)[0])).read_all()
+    strings = {pa.string(): pd.StringDtype("pyarrow"), pa.large_string(): pd.StringDtype("pyarrow")}
+    return table.to_pandas(types_mapper=strings.get)
 
 def load_df(path: Path) -> pd.DataFrame:
-    rows = json.loads(path.read_text())
-    df = pd.DataFrame(rows)
+    df = read_arrow(path) if path.suffix == ".arrow" else pd.DataFrame(read_raw(path))
     for c in ("title","summary","link","source","published"):
         if c not in df.columns: df[c] = None
     df["title"] = df["title"].fillna("").astype(str).str.strip()
@@ -44,36 +86,93 @@ def load_df(path: Path) -> pd.DataFrame:
     df["title"] = df["title"].str.replace(CLEAN_TITLE, "", regex=True).str.strip()
 
     df["link"] = df["link"].fillna("").astype(str).str.strip()
-    df["link_norm"] = df["link"].apply(normalize_link)
+    # link_norm, domain and link_hash in one pass over distinct links
+    df[["link_norm", "domain", "link_hash"]] = canonicalize(df["link"])
 
     df["source"] = df["source"].fillna("Unknown").astype(str).str.strip()
     df["published"] = pd.to_datetime(df["published"], errors="coerce", utc=True)
-
-    from urllib.parse import urlparse as up
-    df["domain"] = df["link_norm"].apply(lambda u: up(u).netloc if u else "")
     return df
 
-def score(df: pd.DataFrame) -> pd.Series:
-    now = pd.Timestamp.now(tz="UTC")
-    pub = df["published"].fillna(now)
-    rec = (pub.astype("int64", copy=False) / 1e9)
-    rec = (rec - rec.min()) / (rec.max() - rec.min() + 1e-9)
-
-    tlen = df["title"].str.len().clip(lower=1)
-    tlen = tlen / (tlen.max() or 1)
-
-    bonus = df["domain"].isin(GOOD_DOMAINS).astype(float) * 0.20
-    penalty = df["title"].str.match(BLOCK_TITLE).astype(float) * 0.40
+def update_state(now: pd.Timestamp | None = None) -> pd.DataFrame:
+    """
+    Merge raw snapshots not consumed yet into the rolling state and return it.
+    State is written before the consumed list, so a crash in between only means
+    re-merging the same snapshots next time (the link dedupe makes that idempotent).
+    """
+    now = now or pd.Timestamp.now(tz="UTC")
+    consumed = set(json.loads(STATE_CONSUMED.read_text())) if STATE_CONSUMED.exists() else set()
+    state = pd.read_parquet(STATE_ROWS, engine="fastparquet") if STATE_ROWS.exists() else pd.DataFrame(columns=STATE_COLS)
+
+    cutoff = now - ROLLING_WINDOW
+    in_window = lambda d: d[d["published"].ge(cutoff) | (d["published"].isna() & d["fetch_ts"].ge(cutoff))]
+
+    snaps = raw_snapshots()
+    new = [p for p in snaps if p.name not in consumed]
+    if not new:
+        return in_window(state).reset_index(drop=True)
+    frames = [load_df(p).assign(fetch_ts=snapshot_ts(p))[STATE_COLS] for p in new]
+    df = pd.concat(frames if state.empty else [state, *frames], ignore_index=True)
+    df["published"] = pd.to_datetime(df["published"], utc=True)
+    df["fetch_ts"] = pd.to_datetime(df["fetch_ts"], utc=True)
+
+    # latest sighting of each link wins; then drop what fell out of the window
+    df = df.sort_values("fetch_ts", kind="stable").drop_duplicates(subset=["link_norm"], keep="last")
+    df = in_window(df).reset_index(drop=True)
+
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = STATE_ROWS.with_suffix(".tmp")
+    df.to_parquet(tmp, index=False, engine="fastparquet")
+    tmp.replace(STATE_ROWS)
+    names = {p.name for p in snaps} & (consumed | {p.name for p in new})  # forget deleted snapshots
+    STATE_CONSUMED.write_text(json.dumps(sorted(names)), encoding="utf-8")
+    return df
 
-    return (0.55*rec + 0.30*tlen + bonus - penalty).clip(lower=0, upper=1)
+# --- content-addressed result cache (raw bytes + window + code) ---
+
+def content_hash(path: Path) -> str:
+    if not path.exists():  # archived: sha1 recorded while compressing (same bytes as the live file)
+        return retention.entry(path.name, path.parent)["sha1"]
+    h = hashlib.sha1()
+    for p in retention.source_files(path):
+        with p.open("rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    return h.hexdigest()
+
+def code_hash() -> str:
+    h = hashlib.sha1(TRANSFORM_VERSION.encode())
+    here = Path(__file__).resolve().parent
+    for name in CODE_FILES:
+        h.update((here / name).read_bytes())
+    return h.hexdigest()
+
+def cache_key(path: Path, window: str | None, now: pd.Timestamp, weights: dict | None = None) -> str:
+    # results depend on "now" (window start, recency fill), so the key carries the hour;
+    # the effective ranking weights go in too (module defaults merged with overrides)
+    parts = [content_hash(path), str(window), now.floor("h").isoformat(), code_hash(),
+             json.dumps({**WEIGHTS, **(weights or {})}, sort_keys=True)]
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+def load_cached(key: str) -> pd.DataFrame | None:
+    p = CACHE_DIR / f"{key}.parquet"
+    if not p.exists():
+        return None
+    try:
+        return pd.read_parquet(p, engine="fastparquet")
+    except Exception:
+        return None
 
-def transform(window: str | None = None) -> pd.DataFrame:
-    path = latest_raw()
-    df = load_df(path)
+def save_cached(key: str, df: pd.DataFrame):
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = CACHE_DIR / f"{key}.tmp"
+    df.to_parquet(tmp, index=False, engine="fastparquet")
+    tmp.replace(CACHE_DIR / f"{key}.parquet")
+    for old in sorted(CACHE_DIR.glob("*.parquet"), key=lambda p: p.stat().st_mtime)[:-CACHE_KEEP]:
+        old.unlink(missing_ok=True)
 
+def finalize(df: pd.DataFrame, window: str | None, now: pd.Timestamp, weights: dict | None = None) -> pd.DataFrame:
     # window filter
     if window:
-        now = pd.Timestamp.now(tz="UTC")
         start = now.floor("D") if window == "today" else (now - pd.Timedelta(hours=24))
         recent = df["published"].ge(start)
         df = pd.concat([df[recent], df[df["published"].isna()]], ignore_index=True)
@@ -83,14 +182,49 @@ def transform(window: str | None = None) -> pd.DataFrame:
     df = df.drop_duplicates(subset=["link_norm"], keep="first")
     df = df.drop_duplicates(subset=["title_norm"], keep="first")
 
-    ts = path.stem.replace("kernelcut_", "")
-    df["fetch_ts"] = pd.to_datetime(ts, format="%Y%m%dT%H%M%SZ", utc=True)
-
-    df["score"] = score(df)
-    df = df.sort_values("score", ascending=False).reset_index(drop=True)
+    df = Ranker(weights, as_of=now).annotate(df)
+    # same story under different headlines/outlets: keep the best-ranked one
+    df = collapse(df, by="rank_key")
+
+    # mantém um top razoável (bounded top-K, no full sort)
+    return TopK(200).push(df).result() if len(df) else df.reset_index(drop=True)
+
+def transform(window: str | None = None, incremental: bool = False, cache: bool = True,
+              weights: dict | None = None) -> pd.DataFrame:
+    """
+    Score the latest raw snapshot, or with incremental=True the rolling state built
+    from every snapshot (only new snapshots are parsed on each call).
+    `weights` overrides rank.WEIGHTS for this call (e.g. {"half_life_h": 12}).
+    Snapshot results are memoized under data/cache/transform, keyed on the snapshot,
+    window, hour, code and weights: the CLI, quality.py and storage.py (all window="today")
+    in the same run reuse the first call's frame. digest.py reads storage, not this.
+    """
+    now = pd.Timestamp.now(tz="UTC")
+    if incremental:
+        return finalize(update_state(now), window, now, weights)
 
-    # mantém um top razoável
-    return df.head(200)
+    path = latest_raw()
+    key = cache_key(path, window, now, weights) if cache else None
+    if key and (hit := load_cached(key)) is not None:
+        return hit
+    df = load_df(path)
+    df["fetch_ts"] = snapshot_ts(path)
+    df = finalize(df, window, now, weights)
+    if key:
+        save_cached(key, df)
+    return df
 
 if __name__ == "__main__":
-    print(transform("today").head(12)[["title","domain","score"]])
\ No newline at end of file
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--window", default="today", choices=["today","24h"])
+    ap.add_argument("--incremental", action="store_true", help="use the rolling multi-snapshot state")
+    ap.add_argument("--weight", action="append", default=[], metavar="NAME=VALUE",
+                    help=f"override a ranking weight ({', '.join(WEIGHTS)}); repeatable")
+    args = ap.parse_args()
+    weights = {}
+    for w in args.weight:
+        name, _, value = w.partition("=")
+        if name not in WEIGHTS:
+            ap.error(f"unknown weight {name!r} (one of: {', '.join(WEIGHTS)})")
+        weights[name] = float(value)
+    print(transform(args.window, incremental=args.incremental, weights=weights).head(12)[["title","domain","score"]])
\ No newline at end of file